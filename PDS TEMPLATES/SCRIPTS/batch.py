@@ -0,0 +1,29 @@
+import sys
+
+from pds_mapper import run_batch
+
+# =====================================
+# 📦 ALL CAMPAIGNS IN ONE PASS
+# =====================================
+# Usage: python batch.py [--workbook] [CAMPAIGN ...]
+# Lists uploads/ once, routes every file to its campaign by the filename rules
+# in PDS TEMPLATES/MAPPINGS and writes each campaign's usual files. With
+# --workbook all campaigns also go into one workbook, a sheet per campaign.
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    workbook = '--workbook' in argv
+    campaigns = [arg.upper() for arg in argv if not arg.startswith('--')]
+    return run_batch(campaigns or None, workbook=workbook)
+
+
+if __name__ == '__main__':
+    # Force UTF-8 encoding for console output
+    if sys.stdout.encoding != 'utf-8':
+        sys.stdout.reconfigure(encoding='utf-8')
+    try:
+        sys.exit(main())
+    except Exception as e:
+        print(f"❌ Error: {str(e)}")
+        exit(1)
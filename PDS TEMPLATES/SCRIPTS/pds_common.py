@@ -0,0 +1,43 @@
+"""
+Shared paths and helpers for the PDS campaign scripts
+"""
+
+import os
+from datetime import datetime
+
+from pds_templates import AUTO_TEMPLATES_DIR, template_columns  # noqa: F401 (re-exported for the scripts)
+
+# =====================================
+# 📁 PATHS FOR WEB APP
+# =====================================
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+PDS_TEMPLATES_DIR = os.path.dirname(SCRIPTS_DIR)
+BASE_DIR = os.path.dirname(PDS_TEMPLATES_DIR)  # tracker root
+UPLOADS_DIR = os.path.join(BASE_DIR, "uploads")
+FINTECH_TEMPLATE = os.path.join(AUTO_TEMPLATES_DIR, "Template_Fintech.xlsx")
+
+
+def run_context(today=None):
+    """Dates and folders for a single campaign run"""
+    today = today or datetime.today()
+    month_abbr = today.strftime('%b').upper()
+    month_full = today.strftime('%B').upper()
+    day = today.strftime('%d')
+    month_day = f"{month_abbr.lower()}_{day}"
+
+    output_folder = os.path.join(BASE_DIR, "data", month_full, "OUTPUT_FOLDER", "PDS OUTPUT")
+    output_dir = os.path.join(output_folder, month_day)
+    os.makedirs(UPLOADS_DIR, exist_ok=True)
+    os.makedirs(output_dir, exist_ok=True)
+
+    return {
+        'today': today,
+        'year': today.year,
+        'month_abbr': month_abbr,
+        'month_full': month_full,
+        'day': day,
+        'date_str': today.strftime('%Y_%m_%d'),
+        'month_day': month_day,
+        'source_dir': UPLOADS_DIR,
+        'output_dir': output_dir,
+    }
@@ -0,0 +1,117 @@
+"""
+Shared date parsing for lender files.
+
+``parse_dates(series, formats, dayfirst, strip_gmt)`` converts a whole column
+at once and returns ``(parsed, failed)``: naive datetimes plus the number of
+non-blank values that could not be parsed.
+
+- JavaScript-style ``Mon Oct 14 2025 00:00:00 GMT+0800 (...)`` values lose the
+  ``GMT...`` suffix in one pass when ``strip_gmt`` is set and are parsed with
+  GMT_FORMAT unless other formats are given
+- ``formats`` are tried in order as exact formats (``"%d.%m.%Y"`` for KVIKU),
+  with no per-row format guessing
+- every bundled mapping lists its lender's formats (ISO dates for most); a
+  mapping without formats gets the column parsed in one call with the format
+  pandas infers from the data
+- whatever is still unparsed (odd rows, mixed time zones) falls back to
+  parsing value by value, so a few odd rows don't blank the whole column
+"""
+
+import warnings
+
+import numpy as np
+import pandas as pd
+
+# What's left of "Mon Oct 14 2025 00:00:00 GMT+0800 (Philippine Standard Time)"
+GMT_FORMAT = '%a %b %d %Y %H:%M:%S'
+
+
+def parse_one(value, dayfirst=False, strip_gmt=False):
+    """Parse a single value the forgiving way; NaT if it isn't a date"""
+    if pd.isna(value):
+        return pd.NaT
+    try:
+        if strip_gmt and 'GMT' in str(value):
+            value = str(value).split(' GMT')[0]
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', UserWarning)
+            parsed = pd.to_datetime(value, errors='coerce', dayfirst=dayfirst)
+
+        # Remove timezone info if present
+        if parsed is not pd.NaT and getattr(parsed, 'tz', None) is not None:
+            parsed = parsed.tz_localize(None)
+        return parsed
+    except (ValueError, TypeError, OverflowError):
+        return pd.NaT
+
+
+def _naive(values):
+    values = pd.DatetimeIndex(values)
+    return values.tz_localize(None) if values.tz is not None else values
+
+
+def _text(series, strip_gmt):
+    """Stripped strings ('' for missing) as an object array, which pd.to_datetime parses fastest"""
+    text = series.to_numpy(dtype=object, copy=True)
+    text[series.isna().to_numpy()] = ''
+    text = np.strings.strip(text.astype(str))
+    if strip_gmt and len(text):
+        text = np.strings.partition(text, ' GMT')[0]
+    return text.astype(object)
+
+
+def parse_dates(series, formats=None, dayfirst=False, strip_gmt=False):
+    """Parse a column to naive datetimes; returns (parsed, number of values that failed)"""
+    if isinstance(series.dtype, pd.DatetimeTZDtype):
+        return series.dt.tz_localize(None), 0
+    if pd.api.types.is_datetime64_dtype(series.dtype):
+        return series, 0
+
+    parsed = pd.Series(pd.NaT, index=series.index, dtype='datetime64[ns]')
+    text = _text(series, strip_gmt)
+    todo = text != ''
+    if strip_gmt and not formats:
+        formats = [GMT_FORMAT]
+
+    for fmt in formats or []:
+        if not todo.any():
+            break
+        values = pd.to_datetime(text[todo], format=fmt, errors='coerce')
+        parsed[todo] = _naive(values)
+        todo &= parsed.isna().to_numpy()
+
+    if not formats and todo.any():
+        # No known format: one vectorized call with the format pandas infers
+        try:
+            with warnings.catch_warnings():
+                warnings.simplefilter('ignore', UserWarning)
+                values = pd.to_datetime(text[todo], errors='coerce', dayfirst=dayfirst)
+            parsed[todo] = _naive(values)
+        except (ValueError, TypeError, OverflowError):
+            pass  # e.g. mixed UTC offsets; everything goes through parse_one below
+        todo &= parsed.isna().to_numpy()
+
+    if todo.any():
+        rest = series[todo].map(lambda value: parse_one(value, dayfirst, strip_gmt))
+        parsed[todo] = pd.to_datetime(rest, errors='coerce')
+        todo &= parsed.isna().to_numpy()
+
+    return parsed, int(todo.sum())
+
+
+# =====================================
+# 📆 ENDORSEMENT / PULL-OUT RULES
+# =====================================
+def pull_out_dates(endorsement, run_time, days=30, expired=None):
+    """Pull-out dates for a whole column, judged against one fixed run timestamp.
+
+    ``days`` after the endorsement date. With ``expired='tomorrow'`` a pull-out
+    date that is already due at run time moves to the day after the run (KVIKU).
+    """
+    run_time = pd.Timestamp(run_time)
+    pull_out = pd.to_datetime(endorsement, errors='coerce') + pd.Timedelta(days=days)
+    if expired == 'tomorrow':
+        pull_out = pull_out.mask(pull_out <= run_time, run_time.normalize() + pd.Timedelta(days=1))
+    elif expired is not None:
+        raise ValueError(f"Unknown pull-out rule for expired dates: '{expired}'")
+    return pull_out
@@ -0,0 +1,148 @@
+"""
+Incremental runs for lenders that resend mostly the same accounts every day.
+
+A spec with ``"incremental": {"key": "Loan_id"}`` keeps the mapped output of
+its last successful run in ``data/cache/incremental/<campaign>.pkl``. Every
+input row gets a fingerprint (a hash of the input columns the mapping reads,
+plus the file group); rows whose fingerprint was seen last time reuse their
+mapped values and only new or changed rows go through the full mapping.
+Columns that depend on the run itself (``today``/``now`` and the transforms in
+``RUN_DEPENDENT_TRANSFORMS``) are always recomputed.
+
+The saved state is dropped when the spec, the template or the mapping code
+changes. ``PDS_INCREMENTAL=0`` ignores it and rebuilds everything.
+"""
+
+import hashlib
+import json
+import os
+import pickle
+
+import numpy as np
+import pandas as pd
+
+from pds_common import BASE_DIR, SCRIPTS_DIR
+from pds_transforms import RUN_DEPENDENT_TRANSFORMS
+
+STATE_DIR = os.path.join(BASE_DIR, "data", "cache", "incremental")
+STATE_VERSION = 1
+INCREMENTAL_ENABLED = os.environ.get('PDS_INCREMENTAL', '1') == '1'
+FINGERPRINT = '_fingerprint'
+
+# Changing any of these may change mapped values, so it invalidates saved states
+CODE_MODULES = ('pds_mapper.py', 'pds_transforms.py', 'pds_phones.py', 'pds_names.py', 'pds_dates.py', 'pds_reader.py')
+
+
+def enabled(spec):
+    return INCREMENTAL_ENABLED and bool(spec.get('incremental'))
+
+
+def state_path(spec):
+    return os.path.join(STATE_DIR, f"{spec['campaign'].lower()}.pkl")
+
+
+def spec_fingerprint(spec, template_cols):
+    digest = hashlib.sha256()
+    digest.update(json.dumps([STATE_VERSION, spec, template_cols], sort_keys=True, default=str).encode('utf-8'))
+    for name in CODE_MODULES:
+        with open(os.path.join(SCRIPTS_DIR, name), 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+def run_dependent(spec):
+    """Output columns whose value depends on the run date, not just the input row"""
+    targets = set()
+    for target, column in spec['columns'].items():
+        steps = column.get('transform', [])
+        steps = [steps] if isinstance(steps, (str, dict)) else steps
+        names = {step if isinstance(step, str) else step['name'] for step in steps}
+        if (column.get('today') or column.get('now') or names & RUN_DEPENDENT_TRANSFORMS
+                or column.get('ref') in targets):
+            targets.add(target)
+    return targets
+
+
+def row_fingerprints(df, columns, group=None):
+    """One uint64 per row from the values of the given input columns and the file group"""
+    values = df[[name for name in columns if name in df.columns]].astype(object)
+    values['__group'] = str(group)
+    return pd.util.hash_pandas_object(values, index=False).to_numpy()
+
+
+class IncrementalState:
+    """Last run's mapped rows by fingerprint, plus the rows of this run to save for the next one"""
+
+    def __init__(self, spec, template_cols, columns):
+        self.spec = spec
+        self.columns = list(columns)
+        self.key = spec['incremental'].get('key', 'Loan_id') if isinstance(spec['incremental'], dict) else 'Loan_id'
+        self.reusable = [col for col in template_cols if col not in run_dependent(spec)]
+        self.fingerprint = spec_fingerprint(spec, template_cols)
+        self.counts = {'new': 0, 'changed': 0, 'unchanged': 0}
+        self._rows = []
+        self._keys = set()
+        self._previous = self._load()
+        self._previous_keys = set(self._previous[self.key].dropna()) if self.key in self._previous.columns else set()
+
+    def _load(self):
+        empty = pd.DataFrame(columns=self.reusable, index=pd.Index([], dtype='uint64', name=FINGERPRINT))
+        try:
+            with open(state_path(self.spec), 'rb') as f:
+                state = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+            return empty
+        if state.get('fingerprint') != self.fingerprint:
+            return empty
+        return state['frame']
+
+    @property
+    def previous_rows(self):
+        return len(self._previous)
+
+    def map_chunk(self, df, group, map_rows):
+        """(full output, delta) for one input chunk; map_rows(rows, known=None) does the mapping"""
+        fingerprints = row_fingerprints(df, self.columns, group)
+        found = np.isin(fingerprints, self._previous.index.to_numpy())
+
+        parts = []
+        if (~found).any() or df.empty:
+            parts.append(map_rows(df[~found]))
+        if found.any():
+            known = self._previous.loc[fingerprints[found], self.reusable]
+            known.index = df.index[found]
+            parts.append(map_rows(df[found], known))
+        out = parts[0] if len(parts) == 1 else pd.concat(parts).loc[df.index]
+
+        delta = out[~found]
+        is_new = ~delta[self.key].isin(self._previous_keys).to_numpy() if self.key in delta.columns else np.ones(len(delta), bool)
+        self.counts['new'] += int(is_new.sum())
+        self.counts['changed'] += int((~is_new).sum())
+        self.counts['unchanged'] += int(found.sum())
+
+        kept = out[self.reusable].copy()
+        kept.index = pd.Index(fingerprints, name=FINGERPRINT)
+        self._rows.append(kept)
+        if self.key in out.columns:
+            self._keys.update(out[self.key].dropna())
+        return out, delta
+
+    @property
+    def removed(self):
+        """Keys of the last run that are not in this one"""
+        return len(self._previous_keys - self._keys)
+
+    def save(self):
+        """Keep this run's rows for the next run (only call after a successful run)"""
+        frame = pd.concat(self._rows) if self._rows else self._previous.iloc[:0]
+        frame = frame[~frame.index.duplicated()]
+        os.makedirs(STATE_DIR, exist_ok=True)
+        target = state_path(self.spec)
+        tmp_path = f"{target}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, 'wb') as f:
+                pickle.dump({'fingerprint': self.fingerprint, 'frame': frame}, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, target)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
@@ -0,0 +1,173 @@
+"""
+Cache of parsed uploads.
+
+Re-running a campaign (after a failed run or a template fix), or running
+another campaign whose mapping reads the same columns of the same upload,
+loads the parsed frames from here instead of parsing the xlsx/csv again.
+
+Entries are keyed by the SHA-256 of the upload's content plus the reader
+options, so a changed file or a changed mapping is a miss, never a stale hit.
+Each entry is the stream of parsed chunks pickled one after another (pyarrow
+isn't a dependency; pickle keeps the pinned dtypes exactly), so loading an
+entry is as flat in memory as the chunked read that produced it.
+
+A read that finds the same entry being written by another thread (the upload
+conversion, see pds_convert) waits for it instead of parsing the file again.
+
+Once the cache grows past ``PDS_INPUT_CACHE_MB`` (default 512) the least
+recently used entries are removed; ``PDS_INPUT_CACHE_MB=0`` turns it off.
+"""
+
+import hashlib
+import json
+import os
+import pickle
+import threading
+
+import pandas as pd
+
+from pds_common import BASE_DIR
+from pds_templates import file_hash
+
+CACHE_DIR = os.environ.get('PDS_INPUT_CACHE_DIR') or os.path.join(BASE_DIR, "data", "cache", "inputs")
+CACHE_LIMIT = int(float(os.environ.get('PDS_INPUT_CACHE_MB') or 512) * 1024 * 1024)
+CACHE_VERSION = 1
+ENTRY_SUFFIX = '.pkl'
+
+_hashes = {}   # upload path -> (size, mtime_ns, sha256), so re-runs in one process don't re-hash
+_writing = {}  # entry path -> Event set when the thread writing it is done
+_lock = threading.Lock()
+
+
+def enabled():
+    return CACHE_LIMIT > 0
+
+
+def content_hash(path):
+    """SHA-256 of an upload, re-computed only when its size or mtime changes"""
+    stat = os.stat(path)
+    with _lock:
+        known = _hashes.get(path)
+    if known and known[:2] == (stat.st_size, stat.st_mtime_ns):
+        return known[2]
+    sha256 = file_hash(path)
+    with _lock:
+        _hashes[path] = (stat.st_size, stat.st_mtime_ns, sha256)
+    return sha256
+
+
+def remember_hash(path, sha256):
+    """Record a hash computed elsewhere (e.g. while an upload was written) for the current file"""
+    stat = os.stat(path)
+    with _lock:
+        _hashes[path] = (stat.st_size, stat.st_mtime_ns, sha256)
+
+
+def entry_path(path, options):
+    key = json.dumps({
+        'version': CACHE_VERSION,
+        'pandas': pd.__version__,  # pickles from another pandas may not load
+        'sha256': content_hash(path),
+        'options': options,
+    }, sort_keys=True, default=str)
+    return os.path.join(CACHE_DIR, hashlib.sha256(key.encode('utf-8')).hexdigest() + ENTRY_SUFFIX)
+
+
+def _read_entry(target):
+    with open(target, 'rb') as f:
+        while True:
+            try:
+                yield pickle.load(f)
+            except EOFError:
+                return
+
+
+def load(path, options):
+    """The cached frames for this upload and options, or None on a miss"""
+    if not enabled():
+        return None
+    target = entry_path(path, options)
+    with _lock:
+        writing = _writing.get(target)
+    if writing:
+        writing.wait()
+    try:
+        os.utime(target)  # mtime is the "last used" time for eviction
+    except OSError:
+        return None
+    return _read_entry(target)
+
+
+def store(path, options, frames):
+    """Pass the frames through, saving them as this upload's entry once all were read.
+
+    If the read fails or stops early, or the cache can't be written, the frames
+    still come through and nothing is cached.
+    """
+    if not enabled():
+        yield from frames
+        return
+
+    target = entry_path(path, options)
+    tmp_path = f"{target}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        out = open(tmp_path, 'wb')
+    except OSError:
+        yield from frames
+        return
+
+    done = threading.Event()
+    with _lock:
+        _writing[target] = done
+    complete = False
+    try:
+        for frame in frames:
+            if out:
+                try:
+                    pickle.dump(frame, out, protocol=pickle.HIGHEST_PROTOCOL)
+                except OSError:
+                    out.close()
+                    out = None
+            yield frame
+        if out:
+            out.close()
+            out = None
+            os.replace(tmp_path, target)
+            complete = True
+    finally:
+        if out:
+            out.close()
+        if not complete and os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        with _lock:
+            if _writing.get(target) is done:
+                del _writing[target]
+        done.set()
+    evict()
+
+
+def evict(limit=None):
+    """Remove the least recently used entries until the cache fits in ``limit`` bytes"""
+    limit = CACHE_LIMIT if limit is None else limit
+    try:
+        entries = [
+            (entry.stat().st_mtime_ns, entry.stat().st_size, entry.path)
+            for entry in os.scandir(CACHE_DIR)
+            if entry.is_file() and entry.name.endswith(ENTRY_SUFFIX)
+        ]
+    except OSError:
+        return
+    total = sum(size for _, size, _ in entries)
+    for _, size, entry in sorted(entries):
+        if total <= limit:
+            break
+        try:
+            os.remove(entry)
+            total -= size
+        except OSError:
+            pass
+
+
+def clear():
+    evict(0)
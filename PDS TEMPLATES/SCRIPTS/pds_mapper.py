@@ -0,0 +1,548 @@
+"""
+Declarative campaign mapper.
+
+Each campaign is described by a JSON spec in ``PDS TEMPLATES/MAPPINGS``: which
+uploaded files belong to it, how every template column is filled, and which
+output files to write. ``run_campaign_spec`` does the whole run; the campaign
+scripts only name their spec.
+
+Column spec keys (one value source, then optional steps, applied in order)::
+
+    "source": "loan_number"      input column ("required": true to fail if missing,
+                                  "default": "" to use a value if missing)
+    "ref": "Loan_id"             an output column mapped earlier in the spec
+    "constant": "Salmon"         the same value on every row
+    "concat": ["a", "b"]         input columns joined with "sep" ("fillna": "" first)
+    "today": true                run date (midnight); "now": true keeps the time
+    "group_value": true          the file group the rows came from (e.g. TALA's DPD bucket)
+    "transform": "date"          name or list of names/{"name": ..., args} from pds_transforms
+    "prefix": "KV-"              string prepended after the transforms
+    "dtype": "str"               read the source column as text ("str": IDs, phones) or
+                                  as numbers ("float": amounts)
+
+Outputs: ``{"file": "..._{today:%Y_%m_%d}.xlsx"}`` for the combined rows; add
+``"per_group": true`` for one file per group or ``"per_group": "sheets"`` for
+one workbook with a sheet per group (``labels`` names the groups).
+With ``"incremental"`` set (see pds_incremental) every combined output also
+gets a ``..._DELTA.xlsx`` (or ``"delta_file"``) with just the new and changed rows.
+
+CSV uploads are mapped chunk by chunk (see pds_reader) and every mapped chunk
+is appended straight to the open output workbooks, so memory use doesn't grow
+with the size of the file.
+"""
+
+import json
+import os
+from datetime import datetime
+
+import pandas as pd
+
+from pds_common import PDS_TEMPLATES_DIR, run_context
+from pds_incremental import IncrementalState, enabled as incremental_enabled
+from pds_reader import iter_source
+from pds_templates import template_columns
+from pds_transforms import TRANSFORMS
+from pds_uploads import get_index
+from pds_writer import DEFAULT_SHEET, XlsxStream, frame_rows
+
+MAPPINGS_DIR = os.path.join(PDS_TEMPLATES_DIR, "MAPPINGS")
+DEFAULT_EXTENSIONS = ['.xlsx', '.csv']
+BATCH_FILE = "Template_Fintech_BATCH_{today:%Y_%m_%d}.xlsx"
+
+
+class MappingError(Exception):
+    """A campaign spec is invalid or the input is missing a required column"""
+
+
+# =====================================
+# 📄 SPECS
+# =====================================
+def spec_path(campaign):
+    return os.path.join(MAPPINGS_DIR, f"{campaign.lower()}.json")
+
+
+def load_spec(campaign):
+    with open(spec_path(campaign), 'r', encoding='utf-8') as f:
+        spec = json.load(f)
+    spec.setdefault('campaign', campaign.upper())
+    spec.setdefault('label', spec['campaign'])
+    spec.setdefault('template', 'Template_Fintech')
+    return spec
+
+
+def available_specs():
+    return sorted(
+        os.path.splitext(name)[0].upper()
+        for name in os.listdir(MAPPINGS_DIR) if name.endswith('.json')
+    )
+
+
+# =====================================
+# 🔍 FILE MATCHING
+# =====================================
+def _rule_matches(rule, filename):
+    name = filename.lower() if rule.get('ignore_case') else filename
+    fold = (lambda s: s.lower()) if rule.get('ignore_case') else (lambda s: s)
+    if 'startswith' in rule and not name.startswith(fold(rule['startswith'])):
+        return False
+    return all(fold(part) in name for part in rule.get('contains', []))
+
+
+def matches(spec, filename):
+    """True if an uploaded file name belongs to this campaign"""
+    files = spec.get('files', {})
+    if not filename.endswith(tuple(files.get('extensions', DEFAULT_EXTENSIONS))):
+        return False
+    return any(_rule_matches(rule, filename) for rule in files.get('match', []))
+
+
+def find_files(spec, source_dir, names=None):
+    """Matching files in source_dir, each distinct file once; grouped specs return {group: path} instead of a list.
+
+    ``names`` limits the search to these file names (the uploads index's routing).
+    """
+    found = sorted(
+        os.path.join(source_dir, name)
+        for name in (os.listdir(source_dir) if names is None else names) if matches(spec, name)
+    )
+    group = spec.get('group')
+    if not group:
+        # the same bytes uploaded twice (e.g. name.csv and name(1).csv) are read once
+        distinct = set(get_index(source_dir).distinct([os.path.basename(path) for path in found]))
+        return [path for path in found if os.path.basename(path) in distinct]
+
+    grouped = {}
+    for path in found:
+        name = os.path.basename(path)
+        name = name.upper() if group.get('ignore_case') else name
+        for value in group['values']:
+            if group['pattern'].format(value=value) in name:
+                grouped[value] = path  # with several uploads per group the last file name wins
+    return {value: grouped[value] for value in group['values'] if value in grouped}
+
+
+# =====================================
+# 📥 INPUT COLUMNS
+# =====================================
+def _transform_steps(column):
+    steps = column.get('transform', [])
+    return [steps] if isinstance(steps, (str, dict)) else steps
+
+
+def input_columns(spec):
+    """{input column: dtype or None} for every input column the spec reads"""
+    columns = {}
+    for target, column in spec['columns'].items():
+        names = [column['source']] if 'source' in column else column.get('concat', [])
+        for name in names:
+            dtype = column.get('dtype')
+            if dtype and columns.get(name) not in (None, dtype):
+                raise MappingError(f"Column '{name}' is read as both {columns[name]} and {dtype} ({target})")
+            columns[name] = dtype or columns.get(name)
+        for step in _transform_steps(column):
+            if isinstance(step, dict) and 'source' in step:
+                columns.setdefault(step['source'], None)
+    return columns
+
+
+def required_columns(spec):
+    """Input columns a run fails without: "required" sources and the columns transforms read"""
+    required = set()
+    for column in spec['columns'].values():
+        if column.get('required'):
+            required.update([column['source']] if 'source' in column else column.get('concat', []))
+        for step in _transform_steps(column):
+            if isinstance(step, dict) and 'source' in step:
+                required.add(step['source'])
+    return sorted(required)
+
+
+def check_columns(spec, header):
+    """How an upload's header row fits a campaign: required columns missing and coverage"""
+    found = {name.strip() if spec.get('strip_headers') and isinstance(name, str) else name for name in header}
+    expected = input_columns(spec)
+    present = [name for name in expected if name in found]
+    return {
+        'campaign': spec['campaign'],
+        'missing': [name for name in required_columns(spec) if name not in found],
+        'absent': [name for name in expected if name not in found],
+        'coverage': round(len(present) / len(expected), 3) if expected else 1.0,
+    }
+
+
+# =====================================
+# 🧩 MAPPING
+# =====================================
+def _apply_transforms(series, column, ctx):
+    for step in _transform_steps(column):
+        if isinstance(step, str):
+            step = {'name': step}
+        args = {k: v for k, v in step.items() if k != 'name'}
+        try:
+            func = TRANSFORMS[step['name']]
+        except KeyError:
+            raise MappingError(f"Unknown transform '{step['name']}' for column {ctx['target']}")
+        series = func(series, ctx, **args)
+    return series
+
+
+def _source_column(source, column, ctx):
+    """Input column by name; missing columns use "default", fail if "required", else None"""
+    df = ctx['df']
+    if source in df.columns:
+        return df[source]
+    if column.get('required'):
+        raise MappingError(f"Column '{source}' not found in {ctx['file']}")
+    if 'default' in column:
+        return pd.Series(column['default'], index=df.index)
+    return None
+
+
+def _column_value(column, ctx):
+    """Value for one output column: a Series aligned to the input rows, or a scalar"""
+    df = ctx['df']
+
+    if 'constant' in column:
+        return column['constant']
+    if column.get('today'):
+        return pd.Timestamp(ctx['run']['today']).normalize()
+    if column.get('now'):
+        return pd.Timestamp(ctx['run']['today'])
+    if column.get('group_value'):
+        return ctx['group']
+
+    if 'ref' in column:
+        value = ctx['out'].get(column['ref'])
+        if value is not None and not isinstance(value, pd.Series):
+            value = pd.Series(value, index=df.index)
+    elif 'concat' in column:
+        parts = [_source_column(source, column, ctx) for source in column['concat']]
+        if any(part is None for part in parts):
+            return None
+        if 'fillna' in column:
+            parts = [part.fillna(column['fillna']).astype(str) for part in parts]
+        value = parts[0]
+        for part in parts[1:]:
+            value = value + column.get('sep', '') + part
+    elif 'source' in column:
+        value = _source_column(column['source'], column, ctx)
+    else:
+        value = None
+
+    if value is None:
+        return None
+    if 'transform' in column:
+        value = _apply_transforms(value, column, ctx)
+    if 'prefix' in column:
+        value = column['prefix'] + value
+    return value
+
+
+def map_frame(df, spec, template_cols, run=None, group=None, file=None, stats=None, known=None):
+    """Build the template-shaped output for one input frame in a single allocation.
+
+    Pass the same ``stats`` dict for every chunk of a file to collect the date
+    parsing failures and report them once with ``report_stats``; without it
+    they are reported for this frame right away. ``known`` holds output columns
+    already mapped for these rows (incremental runs); only the rest are mapped.
+    """
+    ctx = {
+        'df': df,
+        'out': {},
+        'cache': {},
+        'run': run or {'today': datetime.today()},
+        'group': group,
+        'file': file or '(input)',
+        'stats': {} if stats is None else stats,
+    }
+    for target, column in spec['columns'].items():
+        if known is not None and target in known.columns:
+            ctx['out'][target] = known[target]
+            continue
+        ctx['target'] = target
+        ctx['column'] = column
+        ctx['out'][target] = _column_value(column, ctx)
+
+    if stats is None:
+        report_stats(ctx['stats'], ctx['file'])
+    data = {col: ctx['out'].get(col) for col in template_cols}
+    return pd.DataFrame(data, index=df.index, columns=template_cols)
+
+
+def report_stats(stats, file):
+    """Print the columns of one file that had values which couldn't be parsed"""
+    for name, (failed, total) in stats.get('number_failures', {}).items():
+        if failed:
+            print(f"⚠️ {name}: {failed} of {total} values in {file} are not numbers and were kept as text")
+    for target, (failed, total) in stats.get('date_failures', {}).items():
+        if failed:
+            print(f"⚠️ {target}: {failed} of {total} values in {file} could not be parsed as dates")
+
+
+# =====================================
+# 💾 OUTPUT
+# =====================================
+def _output_label(output, group):
+    return output.get('labels', {}).get(group, group)
+
+
+def _output_name(output, run, group=None):
+    return output['file'].format(today=run['today'], group=group, label=_output_label(output, group))
+
+
+def _delta_name(output, run):
+    if 'delta_file' in output:
+        return output['delta_file'].format(today=run['today'])
+    root, ext = os.path.splitext(_output_name(output, run))
+    return f"{root}_DELTA{ext}"
+
+
+class OutputSink:
+    """The open output workbooks of one campaign run; mapped chunks are appended as they come.
+
+    Each group gets its own files or sheets the first time it is started, so a
+    group whose file has no rows still gets a file with just the header row.
+    With ``delta`` the combined outputs get a delta file next to them.
+    """
+
+    def __init__(self, spec, run, columns, delta=False, batch=None):
+        self.spec = spec
+        self.run = run
+        self.columns = columns
+        self.delta = delta
+        self.batch = batch
+        self._streams = {}  # (output index, group or None) -> XlsxStream
+        self._saved = []    # (path, message), in the order the files were opened
+
+    def _stream(self, key, path, message):
+        if key not in self._streams:
+            self._streams[key] = XlsxStream(path)
+            self._saved.append((path, message))
+        return self._streams[key]
+
+    def _targets(self, group):
+        """(stream, sheet name) pairs that the rows of one group go to"""
+        label = self.spec['label']
+        targets = []
+        for index, output in enumerate(self.spec.get('outputs', [])):
+            per_group = output.get('per_group')
+            if per_group == 'sheets':
+                path = os.path.join(self.run['output_dir'], _output_name(output, self.run))
+                stream = self._stream((index, None), path, f"✅ {label} file with one sheet per group saved: {path}")
+                targets.append((stream, str(_output_label(output, group))[:31]))
+            elif per_group:
+                path = os.path.join(self.run['output_dir'], _output_name(output, self.run, group))
+                stream = self._stream((index, group), path, f"📄 Saved {label} {group} file: {path}")
+                targets.append((stream, DEFAULT_SHEET))
+            else:
+                path = os.path.join(self.run['output_dir'], _output_name(output, self.run))
+                stream = self._stream((index, None), path, f"✅ Combined {label} file saved: {path}")
+                targets.append((stream, DEFAULT_SHEET))
+        if self.batch:
+            targets.append(self.batch.target(self.spec))
+        return targets
+
+    def _delta_targets(self):
+        targets = []
+        if not self.delta:
+            return targets
+        for index, output in enumerate(self.spec.get('outputs', [])):
+            if output.get('per_group'):
+                continue
+            path = os.path.join(self.run['output_dir'], _delta_name(output, self.run))
+            stream = self._stream((index, 'delta'), path, f"🔁 {self.spec['label']} delta file (new and changed rows) saved: {path}")
+            targets.append((stream, DEFAULT_SHEET))
+        return targets
+
+    def start(self, group=None):
+        for stream, sheet in self._targets(group) + self._delta_targets():
+            if not stream.has_sheet(sheet):
+                stream.add_sheet(sheet, self.columns)
+
+    def append(self, frame, group=None, delta=None):
+        rows = frame_rows(frame)  # converted once, shared by every file the chunk goes to
+        for stream, sheet in self._targets(group):
+            stream.append(sheet, rows)
+        if delta is not None:
+            delta_rows = frame_rows(delta)
+            for stream, sheet in self._delta_targets():
+                stream.append(sheet, delta_rows)
+
+    def abort(self):
+        """Nothing of this run is saved (the open workbooks are just dropped)"""
+        if self.batch:
+            self.batch.abort(self.spec)
+
+    def close(self):
+        """Save every workbook and return their paths"""
+        paths = []
+        for (path, message), stream in zip(self._saved, self._streams.values()):
+            stream.close()
+            print(message)
+            paths.append(path)
+        return paths
+
+
+def write_outputs(spec, frames, run):
+    """Write the combined output and any per-group files or sheets for already mapped frames"""
+    sink = OutputSink(spec, run, list(next(iter(frames.values())).columns))
+    for group, frame in frames.items():
+        sink.start(group)
+        sink.append(frame, group)
+    return sink.close()
+
+
+# =====================================
+# 🚀 FULL CAMPAIGN RUN
+# =====================================
+def _run_spec(spec, run, names=None, template_cols=None, batch=None):
+    label = spec['label']
+    source_dir = run['source_dir']
+    print(f"📂 Looking for {label} files in: {source_dir}")
+
+    if names is None:
+        names = get_index(source_dir).campaign_names(spec['campaign'])
+    files = find_files(spec, source_dir, names)
+    if not files:
+        print(f"⚠️ No {label} files found yet inside uploads folder.")
+        print(f"📥 Please upload your {label} files via the web interface.")
+        if spec.get('files', {}).get('hint'):
+            print(f"📁 {spec['files']['hint']}")
+        return 0
+
+    grouped = isinstance(files, dict)
+    print(f"✅ Found {label} files: {list(files.values()) if grouped else files}")
+
+    template_cols = template_cols or template_columns(spec['template'])
+    columns = input_columns(spec)
+    state = IncrementalState(spec, template_cols, columns) if incremental_enabled(spec) else None
+    if state:
+        print(f"♻️ Incremental run: {state.previous_rows} mapped rows kept from the last run")
+    sink = OutputSink(spec, run, template_cols, delta=state is not None, batch=batch)
+    processed = 0
+    for group, path in (files.items() if grouped else enumerate(files)):
+        name = os.path.basename(path)
+        group = group if grouped else None
+        print(f"🔹 Processing: {name}")
+        stats = {}
+        chunks = iter_source(path, spec, columns, stats)
+        try:
+            first = next(chunks)
+        except Exception as e:
+            print(f"❌ Failed to read {path}: {e}")
+            continue
+
+        def map_rows(rows, known=None):
+            return map_frame(rows, spec, template_cols, run=run, group=group, file=name, stats=stats, known=known)
+
+        sink.start(group)
+        chunk = first
+        while chunk is not None:
+            if state:
+                mapped, delta = state.map_chunk(chunk, group, map_rows)
+                sink.append(mapped, group, delta)
+            else:
+                sink.append(map_rows(chunk), group)
+            try:
+                chunk = next(chunks, None)
+            except Exception as e:
+                # Rows of this file are already in the outputs; nothing is saved
+                print(f"❌ Failed to read {path}: {e}")
+                print("❌ Output files were not saved.")
+                sink.abort()
+                return 1
+        report_stats(stats, name)
+        processed += 1
+
+    if not processed:
+        print("❌ No files were processed successfully.")
+        return 1
+
+    sink.close()
+    if state:
+        state.save()
+        counts = state.counts
+        print(f"♻️ {counts['new']} new, {counts['changed']} changed, {counts['unchanged']} unchanged rows"
+              f" ({state.removed} {state.key} values from the last run are gone)")
+    print("✅ You can now upload this file to the PDS portal.")
+    return 0
+
+
+def run_campaign_spec(campaign):
+    """Find, read, map and save everything for one campaign"""
+    spec = load_spec(campaign)
+    run = run_context()
+
+    print(f"📅 Date: {run['today'].strftime('%B %d, %Y')}")
+    print(f"📂 Output will be saved to: {run['output_dir']}")
+    return _run_spec(spec, run)
+
+
+# =====================================
+# 📦 BATCH RUN
+# =====================================
+class BatchWorkbook:
+    """One workbook with a sheet per campaign, filled while the campaigns of a batch run"""
+
+    def __init__(self, path):
+        self.path = path
+        self.stream = XlsxStream(path)
+        self.aborted = []
+
+    def target(self, spec):
+        """(stream, sheet name) for a campaign's rows"""
+        return self.stream, str(spec['label'])[:31]
+
+    def abort(self, spec):
+        self.aborted.append(spec['label'])
+
+    def close(self):
+        if self.aborted:
+            print(f"❌ Batch workbook not saved: {', '.join(self.aborted)} stopped halfway through")
+            return None
+        if not self.stream.sheets:
+            return None  # no campaign had any files
+        self.stream.close()
+        print(f"📦 Batch workbook with one sheet per campaign saved: {self.path}")
+        return self.path
+
+
+def run_batch(campaigns=None, workbook=False):
+    """Run several campaigns (all specs by default), routed by the uploads index.
+
+    Each campaign still writes its own files; with ``workbook`` all of them also
+    go, as they are mapped, into one workbook with a sheet per campaign.
+    """
+    run = run_context()
+    index = get_index(run['source_dir'])  # one scan routes the files of every campaign
+    specs = [load_spec(campaign) for campaign in (campaigns or available_specs())]
+    templates = {}  # template name -> columns, shared by the campaigns using it
+
+    print(f"📅 Date: {run['today'].strftime('%B %d, %Y')}")
+    print(f"📂 Output will be saved to: {run['output_dir']}")
+
+    batch = None
+    if workbook:
+        batch = BatchWorkbook(os.path.join(run['output_dir'], BATCH_FILE.format(today=run['today'])))
+
+    failed = []
+    for spec in specs:
+        print(f"\n===== {spec['label']} =====")
+        if spec['template'] not in templates:
+            templates[spec['template']] = template_columns(spec['template'])
+        try:
+            returncode = _run_spec(spec, run, index.campaign_names(spec['campaign']), templates[spec['template']], batch)
+        except Exception as e:
+            print(f"❌ {spec['label']} failed: {e}")
+            if batch:
+                batch.abort(spec)
+            returncode = 1
+        if returncode:
+            failed.append(spec['label'])
+
+    print()
+    if batch:
+        batch.close()
+    print(f"✅ {len(specs) - len(failed)}/{len(specs)} campaigns completed"
+          + (f" (failed: {', '.join(failed)})" if failed else ''))
+    return 1 if failed else 0
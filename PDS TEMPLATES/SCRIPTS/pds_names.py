@@ -0,0 +1,64 @@
+"""
+Vectorized full-name splitting shared by all campaigns.
+
+``split_names(series, mode)`` returns the first_name and last_name columns
+together, using NumPy string ufuncs on a fixed-width array instead of a Python
+split per row:
+
+    rest_last   "Juan Dela Cruz" -> ("Juan Dela", "Cruz")   SALMON, KVIKU, TALACARE, OLP, PR
+    first_last  "Juan Dela Cruz" -> ("Juan", "Cruz")        TALA, HONEYLOAN, PITACASH
+
+Blank or missing names give ("", ""), a single word gives (word, "").
+"""
+
+import numpy as np
+import pandas as pd
+
+NAME_MODES = ('rest_last', 'first_last')
+
+# Lookup table of the code points str.split() treats as whitespace, other than the plain space
+OTHER_WHITESPACE = np.array([chr(c).isspace() and c != 32 for c in range(0x3002)])  # 0x3001 and up: no whitespace
+
+
+def _clean_names(series):
+    """Names as a fixed-width NumPy string array, stripped, with runs of whitespace as one space"""
+    text = series.to_numpy(dtype=object, copy=True)
+    text[series.isna().to_numpy()] = ''
+    text = np.strings.strip(text.astype(str))
+    if text.dtype.itemsize == 0:
+        return text
+
+    # Look at the code points directly: only names with tabs, double spaces and the
+    # like need the regex that collapses whitespace.
+    codes = text.view(np.uint32).reshape(len(text), -1)
+    spaces = codes == 32
+    irregular = (spaces[:, 1:] & spaces[:, :-1]).any(axis=1) | OTHER_WHITESPACE[np.minimum(codes, 0x3001)].any(axis=1)
+    if irregular.any():
+        collapsed = pd.Series(text[irregular]).str.replace(r'\s+', ' ', regex=True)
+        text = text.astype(object)
+        text[irregular] = collapsed.to_numpy(dtype=object)
+        text = text.astype(str)
+    return text
+
+
+def split_names(series, mode='rest_last'):
+    """(first_name, last_name) Series for a full-name column"""
+    if mode not in NAME_MODES:
+        raise ValueError(f"Unknown name mode '{mode}' (expected one of {', '.join(NAME_MODES)})")
+    if series.empty:
+        return pd.Series('', index=series.index), pd.Series('', index=series.index)
+
+    text = _clean_names(series)
+    rest, space, last = np.strings.rpartition(text, ' ')
+    single = space == ''
+
+    if mode == 'rest_last':
+        first = np.where(single, last, rest)
+    else:
+        first = np.strings.partition(text, ' ')[0]
+    last = np.where(single, '', last)
+
+    return (
+        pd.Series(first.astype(object), index=series.index),
+        pd.Series(last.astype(object), index=series.index),
+    )
@@ -0,0 +1,184 @@
+"""
+Vectorized phone-number normalization shared by all campaigns.
+
+``normalize_phones(series, style)`` works on a whole column with NumPy string
+ufuncs, so large endorsement files don't pay a Python call per row. Missing
+values stay missing, except in the salmon and 63_to_0 styles where they become ''. Each style
+reproduces the formatting a campaign used before:
+
+    salmon     NaN/#N/A -> '', scientific notation and ``=63+...`` formulas
+               evaluated, then 0 + 10 digits (63 country code dropped); '' if invalid
+    63_to_0    NaN/#N/A -> '', '.0' removed, leading 63 replaced by 0
+    last10     '0' + the last 10 digits (KVIKU, TALACARE, OLP, PR)
+    honeyloan  like last10, but a column with no numbers at all stays blank
+    skyro      '0' + the number without its first two digits
+    skyro_contacts  same, using the first run of digits in free text
+    tala       leading apostrophe so Excel keeps the number as text
+    tala_alternate  like tala, but missing numbers stay blank
+"""
+
+import numpy as np
+import pandas as pd
+from numpy.dtypes import StringDType
+
+MISSING_VALUES = ['#N/A', 'N/A', '']
+INT64_SAFE = 9.2e18  # floats below this are formatted exactly via int64
+
+
+def _format_integral(numbers):
+    """Format floats like f"{x:.0f}" without a Python call per value"""
+    numbers = pd.Series(numbers, dtype='float64')
+    out = pd.Series(np.nan, index=numbers.index, dtype=object)
+
+    safe = (np.isfinite(numbers) & (numbers.abs() < INT64_SAFE)).to_numpy()
+    out[safe] = np.round(numbers[safe]).astype('int64').astype(str).to_numpy()
+
+    # Huge values and inf are rare enough to format one by one
+    rest = ~safe & numbers.notna().to_numpy()
+    if rest.any():
+        out[rest] = numbers[rest].map(lambda x: f"{x:.0f}").to_numpy()
+    return out
+
+
+def _expand_scientific(text):
+    """6.39778E+11 -> 639778000000 (values float() can't parse are left as they are)"""
+    is_sci = text.str.upper().str.contains('E+', regex=False).to_numpy()
+    if not is_sci.any():
+        return text
+    numbers = pd.to_numeric(text[is_sci], errors='coerce')
+    expanded = _format_integral(numbers).where(numbers.notna().to_numpy(), text[is_sci].to_numpy())
+    text = text.copy()
+    text[is_sci] = expanded.to_numpy()
+    return text
+
+
+def _evaluate_formulas(text):
+    """=63+639175544518 -> the sum; non-numeric parts are just joined; =x -> x"""
+    is_formula = text.str.startswith('=').to_numpy()
+    if not is_formula.any():
+        return text
+    text = text.copy()
+    text[is_formula] = text[is_formula].str[1:].to_numpy()
+
+    is_sum = is_formula & text.str.contains('+', regex=False).to_numpy()
+    if is_sum.any():
+        sums = text[is_sum]
+        parts = sums.str.split('+', expand=True, regex=False)
+        numbers = parts.apply(pd.to_numeric, errors='coerce')
+        numeric = (numbers.notna() | parts.isna()).all(axis=1)
+        joined = sums.str.replace('+', '', regex=False)
+        evaluated = _format_integral(numbers.sum(axis=1)).where(numeric.to_numpy(), joined.to_numpy())
+        text[is_sum] = evaluated.to_numpy()
+    return text
+
+
+def _text(series):
+    """str() of every value as a NumPy string array, so the string ops below run in C"""
+    text = np.asarray(series.astype(str).to_numpy(), dtype=StringDType())
+    text[series.isna().to_numpy()] = ''
+    return text
+
+
+def _column(values, series, missing_value=np.nan):
+    """Back to a Series on the input index; missing inputs get missing_value"""
+    out = pd.Series(values.astype(object), index=series.index)
+    missing = series.isna().to_numpy()
+    if missing.any():
+        out[missing] = missing_value
+    return out
+
+
+def _digits(text):
+    """Drop every non-digit; only values that aren't plain digits go through the regex"""
+    plain = np.strings.isdigit(text)
+    if plain.all():
+        return text
+    text = text.copy()
+    cleaned = pd.Series(text[~plain].astype(object)).str.replace(r'\D', '', regex=True)
+    text[~plain] = cleaned.to_numpy(dtype=object)
+    return text
+
+
+def phone_salmon(series):
+    text = np.strings.strip(_text(series))
+
+    # Scientific notation and =63+... formulas are rare; only those rows take the slow path
+    special = (np.strings.find(text, 'E+') >= 0) | (np.strings.find(text, 'e+') >= 0) | np.strings.startswith(text, '=')
+    if special.any():
+        quirky = pd.Series(text[special].astype(object))
+        text[special] = _evaluate_formulas(_expand_scientific(quirky)).to_numpy(dtype=object)
+
+    digits = _digits(np.strings.replace(text, '.0', ''))
+    lengths = np.strings.str_len(digits)
+    country = np.strings.startswith(digits, '63') & (lengths >= 12)
+
+    # 63 + 10 digits becomes 0 + 10 digits; longer 63 numbers fail the 11-digit check.
+    # '#N/A' and other non-numbers have no digits, so they end up blank as well.
+    result = np.full(len(text), '', dtype=StringDType())
+    with_country = country & (lengths == 12)
+    result[with_country] = np.strings.add('0', np.strings.slice(digits[with_country], 2, None))
+    local = ~country & (lengths >= 10)
+    result[local] = np.strings.add('0', np.strings.slice(digits[local], -10, None))
+    return _column(result, series, missing_value='')
+
+
+def phone_63_to_0(series):
+    text = np.strings.strip(np.strings.replace(_text(series), '.0', ''))
+    country = np.strings.startswith(text, '63') & (np.strings.str_len(text) > 2)
+    text[country] = np.strings.add('0', np.strings.slice(text[country], 2, None))
+    text[series.isin(MISSING_VALUES).to_numpy()] = ''
+    return _column(text, series, missing_value='')
+
+
+def phone_last10(series):
+    # Replace leading country code 63 with 0, remove non-digits, ensure max 11 digits
+    text = _text(series)
+    decimal = np.strings.endswith(text, '.0')
+    text[decimal] = np.strings.slice(text[decimal], 0, -2)
+    return _column(np.strings.add('0', np.strings.slice(_digits(text), -10, None)), series)
+
+
+def phone_honeyloan(series):
+    if pd.isna(series).all():
+        return pd.Series('', index=series.index)
+    return phone_last10(series)
+
+
+def phone_skyro(series):
+    text = np.strings.replace(_text(series), '.0', '')
+    return _column(np.strings.add('0', np.strings.slice(text, 2, None)), series)
+
+
+def phone_skyro_contacts(series):
+    # ADDITIONAL_CONTACTS holds free text; the first run of digits is the number
+    return '0' + series.str.extract(r'(\d+)')[0].str[2:]
+
+
+def phone_tala(series):
+    # Leading apostrophe keeps Excel from turning the number into a float
+    text = np.strings.strip(np.strings.replace(_text(series), '.0', ''))
+    return _column(np.strings.add("'", text), series)
+
+
+def phone_tala_alternate(series):
+    text = np.strings.strip(np.strings.replace(_text(series), '.0', ''))
+    return _column(np.strings.replace(np.strings.add("'", text), "'nan", ''), series)
+
+
+PHONE_STYLES = {
+    'salmon': phone_salmon,
+    '63_to_0': phone_63_to_0,
+    'last10': phone_last10,
+    'honeyloan': phone_honeyloan,
+    'skyro': phone_skyro,
+    'skyro_contacts': phone_skyro_contacts,
+    'tala': phone_tala,
+    'tala_alternate': phone_tala_alternate,
+}
+
+
+def normalize_phones(series, style='last10'):
+    """Normalize a whole phone column in one of the PHONE_STYLES"""
+    if style not in PHONE_STYLES:
+        raise ValueError(f"Unknown phone style '{style}' (expected one of {', '.join(PHONE_STYLES)})")
+    return PHONE_STYLES[style](series)
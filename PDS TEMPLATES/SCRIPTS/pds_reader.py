@@ -0,0 +1,160 @@
+"""
+Reading uploaded lender files.
+
+CSV files are read in chunks (``PDS_CSV_CHUNK_ROWS`` rows at a time) so a large
+endorsement file never sits in memory whole; each chunk is mapped and written
+before the next one is parsed. The encoding is settled once per file before
+parsing starts, from its first 64 KiB, instead of parsing the whole file as
+UTF-8 and starting over as latin1 when that fails. A UTF-8 file with a stray
+latin1 byte further on doesn't fail the read: that byte is decoded as latin1.
+
+Only the input columns a campaign's mapping uses are parsed. Those marked
+``"dtype": "str"`` (IDs, phone numbers) are read as text exactly as they
+appear in the file, so long numbers never turn into floats or scientific
+notation; ``"float"`` columns (amounts) come back as float64 once thousands
+separators and currency signs are dropped ("PHP 1,234.50" is 1234.5). Values
+that still aren't numbers are kept as they were (the column is then object)
+and counted.
+
+Parsed uploads are kept in pds_input_cache, so reading the same upload again
+with the same options skips the parsing.
+
+``sniff`` reads just the header row and counts the rows without parsing them,
+so an upload can be checked against its campaign's columns right away.
+"""
+
+import codecs
+import os
+
+import pandas as pd
+
+import pds_input_cache
+
+NUMBER_NOISE = r'(?i)[,\s₱$]|php'   # thousands separators, spaces and currency around amounts
+CHUNK_ROWS = int(os.environ.get('PDS_CSV_CHUNK_ROWS') or 50000)
+SAMPLE_BYTES = 64 * 1024       # the encoding is decided on this much of a file
+BLOCK_BYTES = 1024 * 1024      # line counting reads the file in blocks of this size
+FALLBACK_ENCODING = 'latin1'   # decodes any byte, like the old retry did
+LATIN1_BYTES = 'pds_latin1'    # decode error handler: bytes that aren't UTF-8 are read as latin1
+EXCEL_EXTENSIONS = ('.xlsx', '.xls')
+
+
+def is_excel(path):
+    return path.lower().endswith(EXCEL_EXTENSIONS)
+
+
+def _latin1_bytes(error):
+    return error.object[error.start:error.end].decode(FALLBACK_ENCODING), error.end
+
+
+codecs.register_error(LATIN1_BYTES, _latin1_bytes)
+
+
+def detect_encoding(path):
+    """'utf-8' if the start of the file decodes as UTF-8, otherwise latin1"""
+    with open(path, 'rb') as f:
+        sample = f.read(SAMPLE_BYTES)
+    try:
+        # not final: a character cut off at the end of the sample is still UTF-8
+        codecs.getincrementaldecoder('utf-8')().decode(sample)
+    except UnicodeDecodeError:
+        return FALLBACK_ENCODING
+    return 'utf-8'
+
+
+def sniff(path):
+    """{"columns": header row, "rows": data rows (None if unknown)} without parsing the rows"""
+    if path.lower().endswith('.xlsx'):
+        from openpyxl import load_workbook
+        workbook = load_workbook(path, read_only=True)
+        try:
+            sheet = workbook.worksheets[0]
+            header = next(sheet.iter_rows(max_row=1, values_only=True), ())
+            rows = sheet.max_row - 1 if sheet.max_row else None
+        finally:
+            workbook.close()
+        while header and header[-1] is None:
+            header = header[:-1]
+        return {'columns': list(header), 'rows': rows}
+    if is_excel(path):
+        return {'columns': list(pd.read_excel(path, nrows=0).columns), 'rows': None}
+
+    encoding = detect_encoding(path)
+    columns = list(pd.read_csv(path, encoding=encoding, encoding_errors=LATIN1_BYTES, nrows=0).columns)
+
+    # Line count, less the header (quoted fields with line breaks count extra)
+    lines, last = 0, b'\n'
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(BLOCK_BYTES), b''):
+            lines += block.count(b'\n')
+            last = block[-1:]
+    if last != b'\n':
+        lines += 1
+    return {'columns': columns, 'rows': max(lines - 1, 0)}
+
+
+def _header_name(name, spec):
+    return name.strip() if spec.get('strip_headers') and isinstance(name, str) else name
+
+
+def _read_options(header, spec, columns):
+    """usecols and dtype for the reader, in terms of the names actually in the file"""
+    if columns is None:
+        return {}
+    usecols = [name for name in header if _header_name(name, spec) in columns]
+    dtype = {name: str for name in usecols if columns[_header_name(name, spec)] == 'str'}
+    return {'usecols': usecols, 'dtype': dtype}
+
+
+def _finish(df, spec, columns, stats):
+    """Stripped headers and float columns; values that aren't numbers are kept and counted in stats"""
+    df.columns = [_header_name(name, spec) for name in df.columns]
+    for name, dtype in (columns or {}).items():
+        if dtype != 'float' or name not in df.columns:
+            continue
+        values, failed = df[name], 0
+        if not pd.api.types.is_numeric_dtype(values.dtype):
+            cleaned = values.astype('string').str.replace(NUMBER_NOISE, '', regex=True)
+            numbers = pd.to_numeric(cleaned, errors='coerce').astype('float64')
+            bad = numbers.isna() & (cleaned.fillna('') != '')   # blank cells are just missing
+            failed = int(bad.sum())
+            values = numbers.astype(object).mask(bad, values) if failed else numbers
+        df[name] = values if failed else values.astype('float64')
+
+        failures = (stats if stats is not None else {}).setdefault('number_failures', {})
+        before_failed, before_total = failures.get(name, (0, 0))
+        failures[name] = (before_failed + failed, before_total + len(values))
+    return df
+
+
+def _read_chunks(path, spec, columns, chunk_rows):
+    if is_excel(path):
+        options = _read_options(pd.read_excel(path, nrows=0).columns, spec, columns)
+        yield pd.read_excel(path, **options)
+        return
+
+    encoding = detect_encoding(path)
+    header = pd.read_csv(path, encoding=encoding, encoding_errors=LATIN1_BYTES, nrows=0).columns
+    options = _read_options(header, spec, columns)
+    with pd.read_csv(path, encoding=encoding, encoding_errors=LATIN1_BYTES,
+                     chunksize=chunk_rows or CHUNK_ROWS, **options) as reader:
+        yield from reader
+
+
+def iter_source(path, spec, columns=None, stats=None, chunk_rows=None):
+    """DataFrames for one uploaded file: CSVs in chunks, Excel files in one piece.
+
+    ``columns`` is {input column: "str" | "float" | None} (see
+    pds_mapper.input_columns); other input columns are not read at all.
+    """
+    options = {'columns': columns, 'strip_headers': bool(spec.get('strip_headers'))}
+    chunks = pds_input_cache.load(path, options)
+    if chunks is None:
+        chunks = pds_input_cache.store(path, options, _read_chunks(path, spec, columns, chunk_rows))
+    for chunk in chunks:
+        yield _finish(chunk, spec, columns, stats)
+
+
+def read_source(path, spec, columns=None):
+    """Whole file as one DataFrame"""
+    return pd.concat(list(iter_source(path, spec, columns)))
@@ -0,0 +1,126 @@
+"""
+Template registry for the files in PDS TEMPLATES/AUTO_TEMPLATES.
+
+Each template is parsed once and its schema (column order and dtypes) is saved
+to a small ``<template>.schema.json`` sidecar. The sidecar is trusted while the
+xlsx keeps the same size and mtime. If only the mtime changed (copied or
+touched file), the content hash decides whether the xlsx has to be parsed again.
+"""
+
+import hashlib
+import json
+import os
+import threading
+
+import pandas as pd
+
+AUTO_TEMPLATES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "AUTO_TEMPLATES")
+SIDECAR_SUFFIX = '.schema.json'
+SCHEMA_VERSION = 1
+
+_schemas = {}  # template path -> schema
+_lock = threading.Lock()
+
+
+def template_path(name):
+    """Full path of a template given its name (``Template_Fintech``) or file name"""
+    if os.path.isabs(name):
+        return name
+    if not name.endswith('.xlsx'):
+        name += '.xlsx'
+    return os.path.join(AUTO_TEMPLATES_DIR, name)
+
+
+def sidecar_path(path):
+    return path + SIDECAR_SUFFIX
+
+
+def file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _parse_schema(path, stat, sha256):
+    template_df = pd.read_excel(path)
+    columns = template_df.columns.tolist()
+    return {
+        'version': SCHEMA_VERSION,
+        'template': os.path.basename(path),
+        'size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns,
+        'sha256': sha256,
+        'columns': columns,
+        'dtypes': {col: str(dtype) for col, dtype in template_df.dtypes.items()},
+        'order': {col: i for i, col in enumerate(columns)},
+    }
+
+
+def _read_sidecar(path):
+    try:
+        with open(sidecar_path(path), 'r', encoding='utf-8') as f:
+            schema = json.load(f)
+        return schema if schema.get('version') == SCHEMA_VERSION else None
+    except (OSError, ValueError):
+        return None
+
+
+def _write_sidecar(path, schema):
+    target = sidecar_path(path)
+    tmp_path = f"{target}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(schema, f, indent=2)
+        os.replace(tmp_path, target)
+    except OSError:
+        # A read-only checkout still works; the schema is just re-parsed next process
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def _fresh(schema, stat):
+    return schema and schema['size'] == stat.st_size and schema['mtime_ns'] == stat.st_mtime_ns
+
+
+def load_schema(name_or_path='Template_Fintech'):
+    """Schema of a template: ``columns``, ``dtypes`` and ``order``"""
+    path = template_path(name_or_path)
+    stat = os.stat(path)
+
+    with _lock:
+        schema = _schemas.get(path)
+        if _fresh(schema, stat):
+            return schema
+
+        schema = _read_sidecar(path)
+        if not _fresh(schema, stat):
+            sha256 = file_hash(path)
+            if schema and schema.get('sha256') == sha256:
+                schema.update(size=stat.st_size, mtime_ns=stat.st_mtime_ns)
+            else:
+                schema = _parse_schema(path, stat, sha256)
+            _write_sidecar(path, schema)
+
+        _schemas[path] = schema
+        return schema
+
+
+def template_columns(name_or_path='Template_Fintech'):
+    """Column list of a template, in template order"""
+    return list(load_schema(name_or_path)['columns'])
+
+
+def available_templates():
+    """Names of the xlsx templates in AUTO_TEMPLATES"""
+    return sorted(
+        os.path.splitext(entry.name)[0]
+        for entry in os.scandir(AUTO_TEMPLATES_DIR)
+        if entry.is_file() and entry.name.endswith('.xlsx') and not entry.name.startswith('~$')
+    )
+
+
+def warm_all():
+    """Load every template schema (parses only the templates whose sidecar is stale)"""
+    return {name: load_schema(name) for name in available_templates()}
@@ -0,0 +1,82 @@
+"""
+Column transforms referenced by name from the campaign mapping specs.
+
+Every transform takes the column (a Series aligned to the source rows) plus the
+mapping context and returns the new column. Register new ones in TRANSFORMS.
+"""
+
+import pandas as pd
+
+from pds_dates import parse_dates, pull_out_dates
+from pds_names import split_names
+from pds_phones import normalize_phones
+
+
+# =====================================
+# 🧹 PHONE FORMATTING
+# =====================================
+def phone(series, ctx=None, style='last10'):
+    """Normalize a phone column in one of the pds_phones.PHONE_STYLES"""
+    return normalize_phones(series, style)
+
+
+# =====================================
+# 🧩 DATE PARSING
+# =====================================
+def to_date(series, ctx=None, formats=None, dayfirst=False, strip_gmt=False):
+    """Whole-column date parsing (see pds_dates); unparsed values are counted and left blank"""
+    parsed, failed = parse_dates(series, formats=formats, dayfirst=dayfirst, strip_gmt=strip_gmt)
+    if ctx:
+        counts = ctx['stats'].setdefault('date_failures', {})
+        before_failed, before_total = counts.get(ctx['target'], (0, 0))
+        counts[ctx['target']] = (before_failed + failed, before_total + len(series))
+    return parsed
+
+
+def strftime(series, ctx=None, format='%d-%b-%Y'):
+    return series.dt.strftime(format)
+
+
+def plus_days(series, ctx=None, days=0):
+    return series + pd.to_timedelta(days, unit='D')
+
+
+def minus_days_from(series, ctx, source):
+    """Subtract a day count taken from another source column (e.g. DPD)"""
+    return series - pd.to_timedelta(ctx['df'][source], unit='D')
+
+
+def pull_out(series, ctx, days=30, expired=None):
+    """Pull-out date from the endorsement date, against the run's fixed timestamp"""
+    return pull_out_dates(series, ctx['run']['today'], days=days, expired=expired)
+
+
+# =====================================
+# 🧩 NAME SPLITTING
+# =====================================
+def split_name(series, ctx, mode='rest_last', part='first'):
+    """first_name or last_name from a full-name column; both halves are split once per frame"""
+    key = ('split_name', ctx['column'].get('source'), mode)
+    if key not in ctx['cache']:
+        ctx['cache'][key] = split_names(series, mode)
+    first, last = ctx['cache'][key]
+    return first if part == 'first' else last
+
+
+# =====================================
+# 📋 REGISTRY
+# =====================================
+TRANSFORMS = {
+    'str': lambda series, ctx=None: series.astype(str),
+    'strip': lambda series, ctx=None: series.str.strip(),
+    'date': to_date,
+    'strftime': strftime,
+    'plus_days': plus_days,
+    'minus_days_from': minus_days_from,
+    'pull_out': pull_out,
+    'phone': phone,
+    'split_name': split_name,
+}
+
+# Transforms whose result depends on the run timestamp as well as the row (see pds_incremental)
+RUN_DEPENDENT_TRANSFORMS = {'pull_out'}
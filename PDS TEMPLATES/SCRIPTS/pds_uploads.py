@@ -0,0 +1,363 @@
+"""
+Index of the uploads folder.
+
+One ``os.scandir`` pass gives every upload's name, size and mtime without
+extra stat calls; each entry also records the campaigns whose filename rules
+match it and, once known, its content hash. The index is rescanned only when
+the folder's mtime changes (or a mapping spec does), so listing uploads and
+routing them to campaigns is a dictionary lookup however full the folder gets.
+The upload routes ``add()`` each saved file, which keeps the index current
+without a rescan.
+
+Uploads are stored by content: ``store()`` streams the upload into
+``uploads/.store/<sha256>`` while hashing it and links the file name to that
+blob. Uploading bytes that are already in the folder under a name routed to
+the same campaigns is a no-op that returns the existing entry; under a name
+routed elsewhere (a misnamed first upload, say) the new name is linked to the
+same bytes, so the campaign it is meant for sees it without a second copy.
+``distinct()`` lets the mapper read each distinct file once even if older
+duplicates such as ``name(1).xlsx`` are still around.
+
+``validate()`` sniffs an upload's header row (pds_reader.sniff) and checks it
+against the campaigns it is routed to, so a wrong file is caught at upload
+instead of halfway through ``/run``.
+"""
+
+import errno
+import hashlib
+import os
+import shutil
+import threading
+import uuid
+
+from pds_common import UPLOADS_DIR
+from pds_input_cache import content_hash, remember_hash
+from pds_reader import sniff
+
+STORE_DIRNAME = '.store'
+LINK_UNSUPPORTED = (errno.EXDEV, errno.EPERM, errno.ENOTSUP)   # copy instead of hard-linking
+BLOCK_BYTES = 1024 * 1024
+
+_indexes = {}  # folder -> UploadIndex
+_indexes_lock = threading.Lock()
+
+
+def get_index(directory=UPLOADS_DIR):
+    """The shared index of an uploads folder"""
+    directory = os.path.abspath(directory)
+    with _indexes_lock:
+        if directory not in _indexes:
+            _indexes[directory] = UploadIndex(directory)
+        return _indexes[directory]
+
+
+# pds_mapper imports this module, so its names are imported where they are used
+def _specs_signature():
+    from pds_mapper import MAPPINGS_DIR
+    with os.scandir(MAPPINGS_DIR) as entries:
+        return tuple(sorted((entry.name, entry.stat().st_mtime_ns) for entry in entries if entry.name.endswith('.json')))
+
+
+def _detect_campaigns(names):
+    """{file name: [campaigns whose filename rules match it]}"""
+    from pds_mapper import available_specs, load_spec, matches
+    specs = [load_spec(campaign) for campaign in available_specs()]
+    return {name: [spec['campaign'] for spec in specs if matches(spec, name)] for name in names}
+
+
+def _check_columns(header, campaigns):
+    from pds_mapper import check_columns, load_spec
+    return [check_columns(load_spec(campaign), header) for campaign in campaigns]
+
+
+def _link(blob, path):
+    """Give a stored blob a name in the uploads folder (a copy where hard links aren't possible).
+
+    Never replaces an existing file: raises FileExistsError if the name is taken,
+    even by another process that picked the same name a moment earlier.
+    """
+    try:
+        os.link(blob, path)
+    except OSError as e:
+        if e.errno not in LINK_UNSUPPORTED:
+            raise
+        with open(blob, 'rb') as src, open(path, 'xb') as dst:
+            shutil.copyfileobj(src, dst)
+
+
+def numbered_name(filename, taken):
+    """filename, or name(1).ext, name(2).ext, ... if it is taken"""
+    base_name, ext = os.path.splitext(filename)
+    name, counter = filename, 1
+    while taken(name):
+        name = f"{base_name}({counter}){ext}"
+        counter += 1
+    return name
+
+
+class UploadIndex:
+    """Name, size, mtime, campaigns and content hash of every file in one uploads folder"""
+
+    def __init__(self, directory):
+        self.directory = directory
+        self._entries = {}       # file name -> entry dict
+        self._by_campaign = {}   # campaign -> sorted file names
+        self._signature = None   # (folder mtime, specs signature) of the last scan
+        self._lock = threading.RLock()
+
+    def _entry(self, name, stat, campaigns, previous=None):
+        unchanged = previous and (previous['size'], previous['mtime_ns']) == (stat.st_size, stat.st_mtime_ns)
+        return {
+            'name': name,
+            'path': os.path.join(self.directory, name),
+            'size': stat.st_size,
+            'mtime': stat.st_mtime,
+            'mtime_ns': stat.st_mtime_ns,
+            'campaigns': campaigns,
+            'sha256': previous['sha256'] if unchanged else None,
+            'profile': previous.get('profile') if unchanged else None,
+        }
+
+    def _route(self):
+        by_campaign = {}
+        for name in sorted(self._entries):
+            for campaign in self._entries[name]['campaigns']:
+                by_campaign.setdefault(campaign, []).append(name)
+        self._by_campaign = by_campaign
+
+    def refresh(self, force=False):
+        """Rescan the folder if it (or a mapping spec) changed since the last scan"""
+        with self._lock:
+            try:
+                signature = (os.stat(self.directory).st_mtime_ns, _specs_signature())
+            except FileNotFoundError:
+                self._entries, self._by_campaign, self._signature = {}, {}, None
+                return
+            if signature == self._signature and not force:
+                return
+
+            with os.scandir(self.directory) as entries:
+                files = {entry.name: entry.stat() for entry in entries if entry.is_file()}
+            specs_changed = self._signature is None or signature[1] != self._signature[1]
+            new_names = [name for name in files if specs_changed or name not in self._entries]
+            campaigns = _detect_campaigns(new_names)
+            self._entries = {
+                name: self._entry(name, stat, campaigns.get(name, self._entries.get(name, {}).get('campaigns')),
+                                  self._entries.get(name))
+                for name, stat in files.items()
+            }
+            self._route()
+            self._signature = signature
+
+    def add(self, path, sha256=None):
+        """Record a file just saved into the folder and return its entry"""
+        name = os.path.basename(path)
+        with self._lock:
+            if self._signature is None:
+                self.refresh()
+            stat = os.stat(path)
+            entry = self._entry(name, stat, _detect_campaigns([name])[name], self._entries.get(name))
+            self._entries[name] = entry
+            self._route()
+            if sha256:
+                remember_hash(path, sha256)
+            entry['sha256'] = self.content_hash(name)
+            # Saving the file changed the folder mtime; the index has it already, no rescan needed
+            self._signature = (os.stat(self.directory).st_mtime_ns, self._signature[1])
+            return dict(entry)
+
+    def _restat(self, name):
+        """The entry of a file as it is now: a file rewritten in place (which leaves the folder
+        mtime alone) gets a fresh entry without the old hash and profile; a deleted one is dropped"""
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is None:
+                return None
+            try:
+                stat = os.stat(entry['path'])
+            except FileNotFoundError:
+                del self._entries[name]
+                self._route()
+                return None
+            if (stat.st_size, stat.st_mtime_ns) != (entry['size'], entry['mtime_ns']):
+                entry = self._entries[name] = self._entry(name, stat, entry['campaigns'], entry)
+            return entry
+
+    def entries(self):
+        """Every upload, sorted by name"""
+        self.refresh()
+        with self._lock:
+            return [dict(entry) for entry in map(self._restat, sorted(self._entries)) if entry]
+
+    def names(self):
+        self.refresh()
+        with self._lock:
+            return sorted(self._entries)
+
+    def campaign_names(self, campaign):
+        """Names of the uploads routed to a campaign by its filename rules"""
+        self.refresh()
+        with self._lock:
+            return list(self._by_campaign.get(campaign.upper(), []))
+
+    def distinct(self, names):
+        """names without those whose content is the same as an earlier name's (only equal sizes get hashed)"""
+        self.refresh()
+        with self._lock:
+            sizes = {}
+            for name in names:
+                entry = self._restat(name)
+                if entry:
+                    sizes.setdefault(entry['size'], []).append(name)
+            duplicates = set()
+            for same_size in sizes.values():
+                if len(same_size) > 1:
+                    seen = set()
+                    for name in same_size:
+                        sha256 = self.content_hash(name)
+                        if sha256 in seen:
+                            duplicates.add(name)
+                        seen.add(sha256)
+            return [name for name in names if name not in duplicates]
+
+    def find_content(self, size, sha256, campaigns=None):
+        """Entry of an upload with these bytes (routed to exactly these campaigns, if given)"""
+        self.refresh()
+        with self._lock:
+            for name in sorted(self._entries):
+                entry = self._restat(name)
+                if campaigns is not None and entry and sorted(entry['campaigns']) != sorted(campaigns):
+                    continue
+                if entry and entry['size'] == size and self.content_hash(name) == sha256:
+                    return dict(entry)
+        return None
+
+    def store(self, stream, filename, numbered=True):
+        """Save an upload by content and return (entry, duplicate).
+
+        The bytes are hashed as they are written. If the folder already holds the
+        same bytes under a name routed to the same campaigns, nothing is added and
+        that file's entry comes back with ``duplicate`` True. A name taken by a
+        different file gets a (1), (2), ... suffix, or raises FileExistsError when
+        ``numbered`` is False.
+        """
+        store_dir = os.path.join(self.directory, STORE_DIRNAME)
+        os.makedirs(store_dir, exist_ok=True)
+        tmp_path = os.path.join(store_dir, f".{uuid.uuid4().hex}.tmp")
+        digest, size = hashlib.sha256(), 0
+        try:
+            with open(tmp_path, 'wb') as f:
+                for block in iter(lambda: stream.read(BLOCK_BYTES), b''):
+                    digest.update(block)
+                    f.write(block)
+                    size += len(block)
+            return self.store_file(tmp_path, filename, digest.hexdigest(), numbered)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def store_file(self, tmp_path, filename, sha256, numbered=True):
+        """store() for bytes already written to tmp_path (inside the uploads folder) and hashed.
+
+        tmp_path is moved into the store, or left alone if the same bytes are already there.
+        """
+        store_dir = os.path.join(self.directory, STORE_DIRNAME)
+        os.makedirs(store_dir, exist_ok=True)
+        size = os.path.getsize(tmp_path)
+        with self._lock:
+            # Campaigns pick files by name, so the same bytes under a name routed elsewhere are a new upload
+            campaigns = _detect_campaigns([filename])[filename]
+            existing = self.find_content(size, sha256, campaigns)
+            if existing:
+                return existing, True
+
+            if not numbered and os.path.exists(os.path.join(self.directory, filename)):
+                raise FileExistsError(filename)
+
+            same_bytes = self.find_content(size, sha256)
+            if same_bytes:
+                # just checked against its current bytes; the new name shares them
+                blob = same_bytes['path']
+            else:
+                # Always the bytes just written: an old blob may have been changed in place through one of its names
+                blob = os.path.join(store_dir, sha256)
+                os.replace(tmp_path, blob)
+            # The lock is per process; another worker may take the free name first, then try the next one
+            while True:
+                name = numbered_name(filename, lambda n: os.path.exists(os.path.join(self.directory, n)))
+                path = os.path.join(self.directory, name)
+                try:
+                    _link(blob, path)
+                    break
+                except FileExistsError:
+                    if not numbered:
+                        raise
+            return self.add(path, sha256), False
+
+    def validate(self, name):
+        """Header profile of an upload: rows, columns and, per campaign, required columns missing.
+
+        ``ok`` is False when the file is routed to campaigns and none of them
+        can run on it: a required column is missing or no mapped column is there.
+        """
+        self.refresh()
+        with self._lock:
+            entry = self._entries.get(name)
+        if entry is None:
+            raise FileNotFoundError(name)
+        try:
+            header = sniff(entry['path'])
+        except Exception as e:
+            # not a readable xlsx/csv; only a problem if a campaign would read it
+            profile = {'rows': None, 'columns': 0, 'campaigns': [], 'ok': not entry['campaigns'], 'error': str(e)}
+        else:
+            checks = _check_columns(header['columns'], entry['campaigns'])
+            profile = {
+                'rows': header['rows'],
+                'columns': len(header['columns']),
+                'campaigns': checks,
+                'ok': not checks or any(not check['missing'] and check['coverage'] for check in checks),
+            }
+        with self._lock:
+            if name in self._entries:
+                self._entries[name]['profile'] = profile
+        return profile
+
+    def remove(self, name):
+        """Delete an upload (and its stored blob once nothing links to it)"""
+        with self._lock:
+            path = os.path.join(self.directory, name)
+            if os.path.exists(path):
+                os.remove(path)
+            self._entries.pop(name, None)
+            self._route()
+            if self._signature is not None:
+                self._signature = (os.stat(self.directory).st_mtime_ns, self._signature[1])
+            self.collect_garbage()
+
+    def collect_garbage(self):
+        """Remove stored blobs that no upload name links to any more"""
+        store_dir = os.path.join(self.directory, STORE_DIRNAME)
+        removed = 0
+        with self._lock:
+            try:
+                entries = list(os.scandir(store_dir))
+            except FileNotFoundError:
+                return 0
+            for entry in entries:
+                if entry.is_file() and not entry.name.endswith('.tmp') and entry.stat().st_nlink == 1:
+                    os.remove(entry.path)
+                    removed += 1
+        return removed
+
+    def content_hash(self, name):
+        """SHA-256 of an upload, computed once per version of the file"""
+        with self._lock:
+            entry = self._restat(name)
+            if entry and entry['sha256']:
+                return entry['sha256']
+        sha256 = content_hash(os.path.join(self.directory, name))
+        with self._lock:
+            if self._entries.get(name) is entry and entry is not None:
+                entry['sha256'] = sha256
+        return sha256
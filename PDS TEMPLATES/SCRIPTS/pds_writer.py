@@ -0,0 +1,170 @@
+"""
+Output writers for the PDS files.
+
+The frame is converted to plain row tuples once (``frame_rows``) and those rows
+are streamed into every file or sheet that needs them. TALA's ALL file and its
+per-DPD files therefore share one conversion. ``XlsxStream`` keeps a workbook
+open so mapped chunks can be appended as they are produced.
+
+Backends (``PDS_XLSX_WRITER`` or the ``backend`` argument):
+
+    stream   openpyxl write-only workbook: rows go straight to the zip stream,
+             memory stays flat however many rows there are (default)
+    pandas   DataFrame.to_excel, the old behaviour, kept as a fallback
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Alignment, Border, Font, Side
+
+DEFAULT_BACKEND = os.environ.get('PDS_XLSX_WRITER', 'stream')
+DEFAULT_SHEET = 'Sheet1'
+
+_THIN = Side(style='thin')
+HEADER_FONT = Font(bold=True)
+HEADER_BORDER = Border(left=_THIN, right=_THIN, top=_THIN, bottom=_THIN)
+HEADER_ALIGNMENT = Alignment(horizontal='center', vertical='top')
+
+
+# =====================================
+# 🔄 FRAME -> ROWS
+# =====================================
+def _column_values(column):
+    """Python values for one column; missing values become None (empty cells)"""
+    if pd.api.types.is_datetime64_any_dtype(column.dtype):
+        values = column.dt.tz_localize(None) if column.dt.tz is not None else column
+        values = np.array(values.dt.to_pydatetime(), dtype=object)
+    else:
+        values = column.to_numpy(dtype=object)
+    missing = pd.isna(column).to_numpy()
+    if missing.any():
+        values = values.copy()
+        values[missing] = None
+    return values.tolist()
+
+
+def frame_rows(df):
+    """Rows of a frame as tuples of plain Python values, built once and reused"""
+    if df.empty:
+        return []
+    return list(zip(*(_column_values(df[col]) for col in df.columns)))
+
+
+# =====================================
+# 💾 BACKENDS
+# =====================================
+def _header_cells(sheet, columns):
+    cells = []
+    for name in columns:
+        cell = WriteOnlyCell(sheet, value=name)
+        cell.font = HEADER_FONT
+        cell.border = HEADER_BORDER
+        cell.alignment = HEADER_ALIGNMENT
+        cells.append(cell)
+    return cells
+
+
+class _StreamBackend:
+    """openpyxl write-only workbook; each sheet spools its rows to a temp file"""
+
+    def __init__(self):
+        self._workbook = Workbook(write_only=True)
+        self._sheets = {}
+
+    def add_sheet(self, name, columns):
+        sheet = self._workbook.create_sheet(title=name)
+        sheet.append(_header_cells(sheet, columns))
+        self._sheets[name] = sheet
+
+    def append(self, name, rows):
+        sheet = self._sheets[name]
+        for row in rows:
+            sheet.append(row)
+
+    def save(self, path):
+        self._workbook.save(path)
+
+
+class _PandasBackend:
+    """Collects the rows and writes them with DataFrame.to_excel on save"""
+
+    def __init__(self):
+        self._sheets = {}
+
+    def add_sheet(self, name, columns):
+        self._sheets[name] = (columns, [])
+
+    def append(self, name, rows):
+        self._sheets[name][1].extend(rows)
+
+    def save(self, path):
+        with pd.ExcelWriter(path) as writer:
+            for name, (columns, rows) in self._sheets.items():
+                pd.DataFrame(rows, columns=columns).to_excel(writer, sheet_name=name, index=False)
+
+
+WRITERS = {
+    'stream': _StreamBackend,
+    'pandas': _PandasBackend,
+}
+
+
+class XlsxStream:
+    """One output workbook that rows are appended to as they are produced.
+
+    Nothing appears at ``path`` until ``close()``; the file is written under a
+    temp name and renamed into place, so readers never see a half-written file.
+    """
+
+    def __init__(self, path, backend=None):
+        backend = backend or DEFAULT_BACKEND
+        if backend not in WRITERS:
+            raise ValueError(f"Unknown xlsx writer '{backend}' (expected one of {', '.join(WRITERS)})")
+        self.path = path
+        self.rows = 0
+        self._backend = WRITERS[backend]()
+        self._sheets = set()
+
+    def add_sheet(self, name, columns):
+        self._backend.add_sheet(name, columns)
+        self._sheets.add(name)
+
+    def append(self, name, rows):
+        self._backend.append(name, rows)
+        self.rows += len(rows)
+
+    def has_sheet(self, name):
+        return name in self._sheets
+
+    @property
+    def sheets(self):
+        return len(self._sheets)
+
+    def close(self):
+        root, ext = os.path.splitext(self.path)
+        tmp_path = f"{root}.{os.getpid()}.tmp{ext}"
+        try:
+            self._backend.save(tmp_path)
+            os.replace(tmp_path, self.path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        return self.path
+
+
+def write_workbook(path, sheets, backend=None):
+    """Write [(sheet_name, columns, rows), ...] to one xlsx file"""
+    stream = XlsxStream(path, backend)
+    for sheet_name, columns, rows in sheets:
+        stream.add_sheet(sheet_name, columns)
+        stream.append(sheet_name, rows)
+    return stream.close()
+
+
+def write_frame(path, df, sheet_name=DEFAULT_SHEET, backend=None):
+    """Single-sheet shortcut for one DataFrame"""
+    return write_workbook(path, [(sheet_name, list(df.columns), frame_rows(df))], backend)
@@ -1,4 +1,4 @@
-from flask import Flask, render_template, request, jsonify, redirect, url_for, send_file
+from flask import Flask, render_template, request, jsonify, redirect, url_for, send_file, Response, stream_with_context
 from werkzeug.utils import secure_filename
 import json
 import os
@@ -20,10 +20,18 @@ from loxon import (
     get_transfer_status,
     cleanup_transfer_files
 )
+import pds_convert
+import pds_engine
+import pds_jobs
+import pds_resumable
+from progress_store import ProgressStore
+from pds_uploads import get_index as get_upload_index
+
 app = Flask(__name__)
 
 # Data storage
-PROGRESS_FILE = 'progress_data.json'
+PROGRESS_DB = 'progress_data.db'
+PROGRESS_FILE = 'progress_data.json'  # before the SQLite store; imported once
 
 # Updated Task categories based on your requirements
 TASK_CATEGORIES = {
@@ -44,44 +52,22 @@ STATUS_COLORS = {
     'N/A': '#6c757d'  # Gray color for N/A
 }
 
+# Longest a dashboard poll of /tasks/state is held open waiting for a change
+TASK_STATE_MAX_WAIT = 25
+
+# Open /tasks/stream connections each hold a server thread; dashboards past this many poll instead
+TASK_STREAM_LIMIT = int(os.environ.get('PDS_TASK_STREAMS') or 16)
+task_stream_slots = threading.BoundedSemaphore(TASK_STREAM_LIMIT)
+
 # Payment reminder times
 PAYMENT_REMINDERS = ['12:00', '20:00']  # 12 noon and 8pm
 
-def load_progress():
-    """Load progress data from JSON file"""
-    if os.path.exists(PROGRESS_FILE):
-        try:
-            with open(PROGRESS_FILE, 'r') as f:
-                return json.load(f)
-        except:
-            pass
-    
-    # Initialize default data
-    today = date.today().strftime('%Y-%m-%d')
-    data = {
-        'last_updated': today,
-        'tasks': {}
-    }
-    
-    for category, items in TASK_CATEGORIES.items():
-        for item in items:
-            data['tasks'][f"{category}_{item}"] = {
-                'category': category,
-                'name': item,
-                'status': 'PENDING',
-                'assigned_to': '',
-                'last_updated': today,
-                'notes': ''
-            }
-    
-    save_progress(data)
-    return data
+# Tasks are kept in SQLite; the old JSON file is imported on first start
+progress_store = ProgressStore(PROGRESS_DB, TASK_CATEGORIES, legacy_json=PROGRESS_FILE)
 
-def save_progress(data):
-    """Save progress data to JSON file"""
-    data['last_updated'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-    with open(PROGRESS_FILE, 'w') as f:
-        json.dump(data, f, indent=2)
+def load_progress():
+    """Current progress data: {'last_updated': ..., 'tasks': {...}}"""
+    return progress_store.snapshot()
 
 def send_payment_reminder():
     """Send payment reminder notification"""
@@ -131,14 +117,11 @@ def update_task():
     new_status = request.json.get('status')
     assigned_to = request.json.get('assigned_to', '')
     notes = request.json.get('notes', '')
+    if new_status not in STATUSES:
+        return jsonify({'success': False, 'message': f"Unknown status: {new_status!r}"}), 400
     
-    data = load_progress()
-    if task_key in data['tasks']:
-        data['tasks'][task_key]['status'] = new_status
-        data['tasks'][task_key]['assigned_to'] = assigned_to
-        data['tasks'][task_key]['notes'] = notes
-        data['tasks'][task_key]['last_updated'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        save_progress(data)
+    changed_by = request.json.get('changed_by') or assigned_to or request.remote_addr or ''
+    if progress_store.update_task(task_key, new_status, assigned_to, notes, changed_by):
         return jsonify({'success': True})
     
     return jsonify({'success': False})
@@ -146,14 +129,75 @@ def update_task():
 @app.route('/reset_all')
 def reset_all():
     """Reset all tasks to PENDING"""
-    data = load_progress()
-    for task_key in data['tasks']:
-        data['tasks'][task_key]['status'] = 'PENDING'
-        data['tasks'][task_key]['assigned_to'] = ''
-        data['tasks'][task_key]['notes'] = ''
-    save_progress(data)
+    progress_store.reset_all(changed_by=request.remote_addr or '')
     return redirect(url_for('dashboard'))
 
+@app.route('/tasks/state')
+def task_state():
+    """Tasks changed since ?since=<revision>&epoch=<epoch> (all without them); ?wait=<seconds> long-polls.
+
+    The ETag is the epoch and revision, so a poll with If-None-Match and nothing new gets a 304.
+    """
+    since = request.args.get('since', type=int)
+    epoch = request.args.get('epoch')
+    wait = min(max(request.args.get('wait', 0, type=float), 0), TASK_STATE_MAX_WAIT)
+
+    etag = f"{progress_store.epoch}-{progress_store.revision}"
+    if wait and request.if_none_match.contains(etag):
+        progress_store.wait(since if since is not None else progress_store.revision, epoch or progress_store.epoch, wait)
+
+    state = progress_store.changes(since, epoch)
+    etag = f"{state['epoch']}-{state['revision']}"
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    else:
+        response = jsonify({'status': 'success', **state})
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+def task_events(since=None, epoch=None):
+    """Server-Sent Events: a ``tasks`` event with the changed tasks after every change"""
+    yield ": connected\n\n"  # sends the headers right away, so the browser sees the stream open
+    while True:
+        state = progress_store.changes(since, epoch)
+        if state['tasks'] or state['full']:
+            yield pds_jobs.sse_message('tasks', json.dumps(state), event_id=f"{state['epoch']}-{state['revision']}")
+        since, epoch = state['revision'], state['epoch']
+        if progress_store.wait(since, epoch, timeout=pds_jobs.KEEPALIVE_SECONDS) == since:
+            yield ": keep-alive\n\n"
+
+@app.route('/tasks/stream')
+def task_stream():
+    """Task changes pushed as they happen; ?since=<revision>&epoch=<epoch> like /tasks/state.
+
+    At most TASK_STREAM_LIMIT streams are open at once; past that the answer is 503
+    and the dashboard polls /tasks/state instead.
+    """
+    if not task_stream_slots.acquire(blocking=False):
+        return jsonify({'status': 'error', 'message': 'Too many open task streams, poll /tasks/state'}), 503
+    # EventSource resends the last id it saw ("epoch-revision") when it reconnects
+    last_id = request.headers.get('Last-Event-ID', '')
+    if '-' in last_id and last_id.rsplit('-', 1)[1].isdigit():
+        epoch, since = last_id.rsplit('-', 1)[0], int(last_id.rsplit('-', 1)[1])
+    else:
+        epoch, since = request.args.get('epoch'), request.args.get('since', type=int)
+    response = Response(
+        stream_with_context(task_events(since, epoch)),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+    # the slot is free again once the browser has gone (noticed at the next write at the latest)
+    response.call_on_close(task_stream_slots.release)
+    return response
+
+@app.route('/task_history')
+@app.route('/task_history/<task_key>')
+def task_history(task_key=None):
+    """Status changes, most recent first (?limit=, default 100)"""
+    limit = request.args.get('limit', 100, type=int)
+    return jsonify({'status': 'success', 'events': progress_store.history(task_key, limit)})
+
 @app.route('/manual_reminder')
 def manual_reminder():
     """Manually trigger payment reminder"""
@@ -212,6 +256,70 @@ def check_endo_folder():
         'date': today.strftime('%B %d, %Y')
     }
 
+# Background PDS jobs (see /jobs routes)
+pds_job_queue = pds_jobs.JobQueue()
+
+# Uploads are parsed in the background so /run starts from cached data
+upload_converter = pds_convert.UploadConverter()
+
+# Large files are uploaded in resumable chunks (see /upload_chunks routes)
+chunked_uploads = pds_resumable.ChunkedUploads(check_endo_folder()['full_path'])
+
+# Header check of new uploads: 'reject' removes files none of their campaigns can run on,
+# 'flag' keeps them with a warning, 'off' skips the check
+UPLOAD_VALIDATION = os.environ.get('PDS_UPLOAD_VALIDATION', 'reject')
+
+def upload_problems(profile):
+    """What is wrong with an upload according to its header profile ('' if nothing)"""
+    if not profile:
+        return ''
+    if profile.get('error'):
+        return f"Could not read the header row: {profile['error']}"
+    problems = []
+    for check in profile['campaigns']:
+        if check['missing']:
+            problems.append(f"{check['campaign']} is missing {', '.join(check['missing'])}")
+        elif not check['coverage']:
+            problems.append(f"{check['campaign']} has none of its mapped columns")
+    return '; '.join(problems)
+
+def check_upload(folder, entry):
+    """Sniff a newly stored upload's header; returns (profile, error response if it is rejected)"""
+    if UPLOAD_VALIDATION == 'off':
+        return None, None
+    index = get_upload_index(folder)
+    profile = index.validate(entry['name'])
+    if profile['ok'] or UPLOAD_VALIDATION != 'reject':
+        return profile, None
+
+    index.remove(entry['name'])
+    message = f"Rejected {entry['name']}: {upload_problems(profile)}"
+    return profile, (jsonify({'status': 'error', 'message': message, 'profile': profile}), 422)
+
+def upload_response(folder, entry, duplicate, uploaded='File uploaded successfully:', **fields):
+    """Finish a stored upload (header check, background conversion); returns (response, status)"""
+    if duplicate:
+        return jsonify({'status': 'success', 'message': f"Already uploaded as {entry['name']}",
+                        'path': entry['path'], 'duplicate': True, 'converting': [],
+                        'profile': entry.get('profile'), **fields}), 200
+    profile, rejected = check_upload(folder, entry)
+    if rejected:
+        return rejected
+    converting = upload_converter.submit(entry['path'], entry['campaigns'])
+
+    message = f"{uploaded} {entry['name']}"
+    problems = upload_problems(profile)
+    if problems:
+        message += f" (⚠️ {problems})"
+    return jsonify({'status': 'success', 'message': message, 'path': entry['path'],
+                    'duplicate': False, 'converting': converting, 'profile': profile, **fields}), 200
+
+def pds_output_folder():
+    """This month's PDS OUTPUT folder"""
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    month_full = datetime.today().strftime('%B').upper()
+    return os.path.join(base_dir, "data", month_full, "OUTPUT_FOLDER", "PDS OUTPUT")
+
 # Add PDS Maker route
 @app.route('/pds_maker')
 def pds_maker():
@@ -225,7 +333,8 @@ def pds_maker():
 def pds_upload(campaign):
     """Handle file upload from PDS Maker UI. Save file using original filename (no campaign prefix).
 
-    Reject upload if the destination file already exists.
+    Reject upload if a different file with the same name already exists; uploading
+    bytes that are already there is a no-op.
     """
     try:
         # Ensure file present
@@ -248,16 +357,13 @@ def pds_upload(campaign):
 
         # Use secure filename and DO NOT prefix with campaign name
         filename = secure_filename(file.filename)
-        dest_path = os.path.join(dest_folder, filename)
 
-        # If file exists, reject as requested
-        if os.path.exists(dest_path):
+        # Store by content; a different file with the same name is rejected
+        try:
+            entry, duplicate = get_upload_index(dest_folder).store(file.stream, filename, numbered=False)
+        except FileExistsError:
             return jsonify({'status': 'error', 'message': 'File with same name already exists'}), 409
-
-        # Save file
-        file.save(dest_path)
-
-        return jsonify({'status': 'success', 'message': f'Uploaded as {filename}', 'path': dest_path})
+        return upload_response(dest_folder, entry, duplicate, uploaded='Uploaded as')
 
     except Exception as e:
         return jsonify({'status': 'error', 'message': str(e)}), 500
@@ -270,8 +376,8 @@ def run_script(campaign_name):
 
     # Use relative path from project root for scripts
     base_dir = os.path.dirname(os.path.abspath(__file__))
-    scripts_dir = os.path.join(base_dir, "PDS TEMPLATES", "SCRIPTS")
-    script_path = os.path.join(scripts_dir, f"{campaign_name.lower()}.py")
+    scripts_dir = pds_engine.SCRIPTS_DIR
+    script_path = pds_engine.script_path(campaign_name)
     
     # Create PDS OUTPUT folder
     today = datetime.today()
@@ -290,53 +396,29 @@ def run_script(campaign_name):
         # Create PDS OUTPUT directory if it doesn't exist
         os.makedirs(pds_output_dir, exist_ok=True)
         
-        # Set environment variables for the script
-        env = os.environ.copy()
-        env['PYTHONPATH'] = scripts_dir
-        
-        result = subprocess.run(
-            [sys.executable, script_path], 
-            capture_output=True, 
-            text=True,
-            encoding='utf-8',
-            cwd=scripts_dir,  # Set working directory to SCRIPTS folder
-            env=env  # Pass environment with PYTHONPATH
-        )
-        
-        # Generate timestamp for the log file
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        log_filename = f"{campaign_name}_{timestamp}.log"
-        log_path = os.path.join(pds_output_dir, log_filename)
+        # Run in-process by default; ?isolated=1 forces a fresh interpreter
+        isolated = True if request.args.get('isolated') == '1' else None
+        result = pds_engine.run_campaign(campaign_name, isolated=isolated)
         
         # Save output to log file in PDS OUTPUT folder
-        with open(log_path, 'w', encoding='utf-8') as log_file:
-            log_file.write(f"Campaign: {campaign_name}\n")
-            log_file.write(f"Script: {script_path}\n")
-            log_file.write(f"Working Directory: {scripts_dir}\n")
-            log_file.write(f"Execution Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-            log_file.write(f"Return Code: {result.returncode}\n")
-            log_file.write("=" * 50 + "\n")
-            log_file.write("STDOUT:\n")
-            log_file.write(result.stdout if result.stdout else "(No output)")
-            log_file.write("\n" + "=" * 50 + "\n")
-            log_file.write("STDERR:\n")
-            log_file.write(result.stderr if result.stderr else "(No errors)")
+        log_path = pds_engine.write_run_log(result, pds_output_dir)
         
-        if result.returncode == 0:
+        if result['returncode'] == 0:
             return jsonify({
                 'status': 'success',
-                'output': result.stdout or '(Script completed with no console output)',
+                'output': result['stdout'] or '(Script completed with no console output)',
                 'message': f'{campaign_name} script completed successfully',
                 'log_file': log_path,
                 'output_folder': pds_output_dir,
-                'debug_info': f'Script executed: {script_path}'
+                'duration': result['duration'],
+                'debug_info': f'Script executed ({result["mode"]}): {script_path}'
             })
         else:
             return jsonify({
                 'status': 'error',
-                'message': f'Script execution failed (Return Code: {result.returncode})',
-                'error': result.stderr,
-                'output': result.stdout,
+                'message': f'Script execution failed (Return Code: {result["returncode"]})',
+                'error': result['stderr'],
+                'output': result['stdout'],
                 'log_file': log_path,
                 'output_folder': pds_output_dir,
                 'debug_info': f'Script path: {script_path}, Working dir: {scripts_dir}'
@@ -350,6 +432,123 @@ def run_script(campaign_name):
             'debug_info': f'Exception occurred while executing {script_path}'
         })
 
+@app.route('/run_all', methods=['POST'])
+def run_all_scripts():
+    """Run all campaigns (or a chosen subset) in parallel on the worker pool"""
+    payload = request.get_json(silent=True) or {}
+    known = [c['name'] for c in CAMPAIGNS]
+    requested = payload.get('campaigns') or known
+    unknown = [name for name in requested if name not in known]
+    if unknown:
+        return jsonify({'status': 'error', 'message': f'Unknown campaign(s): {", ".join(unknown)}'}), 400
+
+    pds_output_dir = pds_output_folder()
+
+    try:
+        isolated = True if payload.get('isolated') else None
+        batch = pds_engine.run_campaigns(requested, pds_output_dir, isolated=isolated)
+    except Exception as e:
+        return jsonify({'status': 'error', 'message': f'Error running batch: {str(e)}'}), 500
+
+    results = []
+    for result in batch['results']:
+        ok = result['returncode'] == 0
+        results.append({
+            'campaign': result['campaign'],
+            'status': 'success' if ok else 'error',
+            'return_code': result['returncode'],
+            'duration': result['duration'],
+            'log_file': result['log_file'],
+            'output': result['stdout'],
+            'error': result['stderr'] if not ok else ''
+        })
+
+    failed = [r['campaign'] for r in results if r['status'] != 'success']
+    return jsonify({
+        'status': 'success' if not failed else 'partial',
+        'message': f'{len(results) - len(failed)}/{len(results)} campaigns completed'
+                   + (f' (failed: {", ".join(failed)})' if failed else ''),
+        'results': results,
+        'workers': batch['workers'],
+        'duration': batch['duration'],
+        'output_folder': pds_output_dir
+    })
+
+@app.route('/run_batch', methods=['POST'])
+def run_batch():
+    """Run campaigns in one pass over uploads/; {"workbook": true} also writes one multi-sheet workbook"""
+    payload = request.get_json(silent=True) or {}
+    known = [c['name'] for c in CAMPAIGNS]
+    requested = payload.get('campaigns') or known
+    unknown = [name for name in requested if name not in known]
+    if unknown:
+        return jsonify({'status': 'error', 'message': f'Unknown campaign(s): {", ".join(unknown)}'}), 400
+
+    pds_output_dir = pds_output_folder()
+    argv = (['--workbook'] if payload.get('workbook') else []) + list(requested)
+    try:
+        isolated = True if payload.get('isolated') else None
+        result = pds_engine.run_campaign('BATCH', isolated=isolated, argv=argv)
+        log_path = pds_engine.write_run_log(result, pds_output_dir)
+    except Exception as e:
+        return jsonify({'status': 'error', 'message': f'Error running batch: {str(e)}'}), 500
+
+    ok = result['returncode'] == 0
+    return jsonify({
+        'status': 'success' if ok else 'partial',
+        'message': 'Batch completed' if ok else f'Batch finished with errors (Return Code: {result["returncode"]})',
+        'output': result['stdout'],
+        'error': result['stderr'],
+        'log_file': log_path,
+        'duration': result['duration'],
+        'output_folder': pds_output_dir
+    })
+
+@app.route('/jobs/submit/<campaign_name>', methods=['POST'])
+def submit_job(campaign_name):
+    """Queue a campaign run in the background and return its job ID"""
+    campaign = next((c for c in CAMPAIGNS if c['name'] == campaign_name), None)
+    if not campaign:
+        return jsonify({'status': 'error', 'message': 'Campaign not found'}), 404
+
+    isolated = True if request.args.get('isolated') == '1' else None
+    job = pds_job_queue.submit(campaign_name, pds_output_folder(), isolated=isolated)
+    return jsonify({
+        'status': 'success',
+        'message': f'{campaign_name} queued',
+        'job_id': job.id,
+        'status_url': url_for('job_status', job_id=job.id),
+        'stream_url': url_for('job_stream', job_id=job.id)
+    }), 202
+
+@app.route('/jobs')
+def list_jobs():
+    """Recent PDS jobs, newest first"""
+    return jsonify({'status': 'success', 'jobs': [job.to_dict() for job in pds_job_queue.recent()]})
+
+@app.route('/jobs/<job_id>')
+def job_status(job_id):
+    job = pds_job_queue.get(job_id)
+    if not job:
+        return jsonify({'status': 'error', 'message': 'Job not found'}), 404
+    return jsonify({'status': 'success', 'job': job.to_dict(include_output=job.finished)})
+
+@app.route('/jobs/<job_id>/stream')
+def job_stream(job_id):
+    """Live script output as Server-Sent Events"""
+    job = pds_job_queue.get(job_id)
+    if not job:
+        return jsonify({'status': 'error', 'message': 'Job not found'}), 404
+
+    # EventSource resends the last id it saw when it reconnects
+    since = request.headers.get('Last-Event-ID', request.args.get('since', '0'))
+    since = int(since) if str(since).isdigit() else 0
+    return Response(
+        stream_with_context(pds_jobs.stream_events(job, since)),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
 @app.route('/open_output_folder')
 def open_output_folder():
     try:
@@ -371,7 +570,7 @@ def open_output_folder():
 
 @app.route('/list_uploads')
 def list_uploads():
-    """List all files in the uploads folder"""
+    """List all files in the uploads folder (served from the uploads index)"""
     try:
         base_dir = os.path.dirname(os.path.abspath(__file__))
         uploads_dir = os.path.join(base_dir, "uploads")
@@ -381,17 +580,15 @@ def list_uploads():
             return jsonify({'status': 'success', 'files': [], 'message': 'Uploads folder created'})
         
         files = []
-        for filename in os.listdir(uploads_dir):
-            if os.path.isfile(os.path.join(uploads_dir, filename)):
-                file_path = os.path.join(uploads_dir, filename)
-                file_size = os.path.getsize(file_path)
-                file_modified = datetime.fromtimestamp(os.path.getmtime(file_path)).strftime('%Y-%m-%d %H:%M:%S')
-                
-                files.append({
-                    'name': filename,
-                    'size': f"{file_size / 1024:.1f} KB",
-                    'modified': file_modified
-                })
+        for entry in get_upload_index(uploads_dir).entries():
+            files.append({
+                'name': entry['name'],
+                'size': f"{entry['size'] / 1024:.1f} KB",
+                'modified': datetime.fromtimestamp(entry['mtime']).strftime('%Y-%m-%d %H:%M:%S'),
+                'campaigns': entry['campaigns'],
+                'sha256': entry['sha256'],
+                'profile': entry.get('profile')
+            })
         
         return jsonify({'status': 'success', 'files': files, 'total': len(files)})
     except Exception as e:
@@ -416,29 +613,72 @@ def upload_to_folder():
         os.makedirs(uploads_dir, exist_ok=True)
         
         filename = secure_filename(file.filename)
-        file_path = os.path.join(uploads_dir, filename)
-        
-        # Handle duplicate files
-        base_name, ext = os.path.splitext(filename)
-        counter = 1
-        while os.path.exists(file_path):
-            new_filename = f"{base_name}({counter}){ext}"
-            file_path = os.path.join(uploads_dir, new_filename)
-            filename = new_filename
-            counter += 1
-        
-        file.save(file_path)
         
-        return jsonify({
-            'status': 'success',
-            'message': f'File uploaded successfully: {filename}',
-            'filename': filename,
-            'path': file_path
-        })
+        # Stored by content: identical bytes for the same campaigns are not saved again, other files get (1), (2), ... names
+        entry, duplicate = get_upload_index(uploads_dir).store(file.stream, filename)
+        return upload_response(uploads_dir, entry, duplicate, filename=entry['name'])
         
     except Exception as e:
         return jsonify({'status': 'error', 'message': str(e)}), 500
 
+@app.route('/upload_conversions')
+def upload_conversions():
+    """Background parsing of recent uploads: queued, running, ready or error"""
+    return jsonify({'status': 'success', 'enabled': upload_converter.enabled,
+                    'conversions': upload_converter.recent()})
+
+@app.route('/upload_chunks', methods=['POST'])
+def start_chunked_upload():
+    """Start (or resume) a chunked upload: {"filename", "size", "key"?, "chunk_size"?}"""
+    data = request.get_json(silent=True) or {}
+    filename = secure_filename(data.get('filename') or '')
+    if not filename or not allowed_file(filename):
+        return jsonify({'status': 'error', 'message': 'File type not allowed. Use CSV, XLS, or XLSX files.'}), 400
+    try:
+        session = chunked_uploads.start(filename, int(data.get('size')), data.get('key'), data.get('chunk_size'))
+    except (TypeError, ValueError) as e:
+        return jsonify({'status': 'error', 'message': f'Invalid upload: {e}'}), 400
+    return jsonify({'status': 'success', **session.status()})
+
+@app.route('/upload_chunks/<upload_id>')
+def chunked_upload_status(upload_id):
+    """Which chunks of an upload have arrived"""
+    session = chunked_uploads.get(upload_id)
+    if session is None:
+        return jsonify({'status': 'error', 'message': 'Upload not found'}), 404
+    return jsonify({'status': 'success', **session.status()})
+
+@app.route('/upload_chunks/<upload_id>/<int:index>', methods=['PUT'])
+def upload_chunk(upload_id, index):
+    """Raw bytes of one chunk; the optional X-Chunk-Sha256 header is checked"""
+    session = chunked_uploads.get(upload_id)
+    if session is None:
+        return jsonify({'status': 'error', 'message': 'Upload not found'}), 404
+    try:
+        written = session.write(index, request.stream, request.headers.get('X-Chunk-Sha256'))
+    except ValueError as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 400
+    # written is False for a chunk that was already there (a retried request)
+    return jsonify({'status': 'success', 'index': index, 'written': written,
+                    'received': len(session.received), 'chunk_count': session.chunk_count})
+
+@app.route('/upload_chunks/<upload_id>/complete', methods=['POST'])
+def complete_chunked_upload(upload_id):
+    """Store a fully uploaded file like /upload_to_folder does"""
+    try:
+        entry, duplicate = chunked_uploads.complete(upload_id)
+    except KeyError:
+        return jsonify({'status': 'error', 'message': 'Upload not found'}), 404
+    except ValueError as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 409
+    return upload_response(chunked_uploads.directory, entry, duplicate,
+                           filename=entry['name'], sha256=entry['sha256'])
+
+@app.route('/upload_chunks/<upload_id>', methods=['DELETE'])
+def abort_chunked_upload(upload_id):
+    chunked_uploads.abort(upload_id)
+    return jsonify({'status': 'success', 'message': 'Upload cancelled'})
+
 @app.route('/create_endo_folder')
 def create_endo_folder():
     endo_status = check_endo_folder()
@@ -688,24 +928,10 @@ def upload_file(campaign_name):
         # Secure the filename WITHOUT campaign prefix
         original_filename = secure_filename(file.filename)
         
-        # Handle duplicate files with (1), (2) numbering
-        base_name, ext = os.path.splitext(original_filename)
-        filename = original_filename
-        counter = 1
-        
-        while os.path.exists(os.path.join(endo_status['full_path'], filename)):
-            filename = f"{base_name}({counter}){ext}"
-            counter += 1
-        
-        file_path = os.path.join(endo_status['full_path'], filename)
-        
         try:
-            file.save(file_path)
-            return jsonify({
-                'status': 'success',
-                'message': f'File uploaded successfully: {filename}',
-                'path': file_path
-            })
+            # Stored by content: identical bytes for the same campaigns are not saved again, other files get (1), (2), ... names
+            entry, duplicate = get_upload_index(endo_status['full_path']).store(file.stream, original_filename)
+            return upload_response(endo_status['full_path'], entry, duplicate)
         except Exception as e:
             return jsonify({
                 'status': 'error',
@@ -721,7 +947,7 @@ if __name__ == '__main__':
     print("📡 Server will be accessible at:")
     print("   Local: http://localhost:4000")
     print("\n👥 Share this with your team!")
-    print("🔄 Auto-refreshes every 30 seconds")
+    print("🔄 Task changes are pushed to open dashboards as they happen")
     print("📊 Real-time progress tracking")
     print("⏰ Payment reminders at 12:00 PM & 8:00 PM")
     
@@ -0,0 +1,37 @@
+"""
+Gunicorn settings; read automatically when the app is served from this folder:
+
+    gunicorn wsgi:application
+
+The app keeps state in process memory: the dashboard tasks (progress_store
+writes them behind), the background job queue and the chunked upload sessions.
+So it runs as ONE worker process. Open Server-Sent Event streams (job output,
+dashboard updates) each hold a thread for as long as the browser listens, so
+that worker is threaded rather than sync.
+
+Threads: PDS_TASK_STREAMS dashboards (default 16) get a live stream, each
+holding a thread; further dashboards poll /tasks/state every 15 seconds.
+On top of those, THREAD_HEADROOM threads serve pages, task updates, uploads
+and job streams. With 30 agents, PDS_TASK_STREAMS=30 gives every dashboard a
+stream and 46 threads; the default keeps it at 32.
+"""
+
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', 4000)}"
+
+# One process: a second worker would have its own tasks, jobs and upload sessions
+workers = 1
+worker_class = 'gthread'
+THREAD_HEADROOM = 16
+threads = int(os.environ.get('PDS_THREADS') or int(os.environ.get('PDS_TASK_STREAMS') or 16) + THREAD_HEADROOM)
+
+# gthread workers heartbeat between requests, so long streams are not killed by this
+timeout = 120
+graceful_timeout = 30
+
+
+def worker_exit(server, worker):
+    """Write pending task changes before the worker goes away"""
+    from app import progress_store
+    progress_store.flush()
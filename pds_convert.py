@@ -0,0 +1,107 @@
+"""
+Background conversion of uploads.
+
+The upload routes only save the file, so the expensive xlsx parse used to
+happen inside ``/run``. ``UploadConverter.submit(path)`` parses a fresh upload
+on a background thread, for every campaign whose mapping matches the file name,
+into pds_input_cache. While the operator uploads the other lenders the files
+are already being parsed, and ``/run`` starts from the cached frames (a run
+that starts mid-conversion waits for it instead of parsing twice).
+
+Turn it off with ``PDS_CONVERT_ON_UPLOAD=0``; it is also off when the input
+cache is (``PDS_INPUT_CACHE_MB=0``).
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import pds_engine  # noqa: F401 (puts the PDS scripts on sys.path)
+import pds_input_cache
+from pds_mapper import available_specs, input_columns, load_spec, matches
+from pds_reader import iter_source
+
+CONVERT_ON_UPLOAD = os.environ.get('PDS_CONVERT_ON_UPLOAD', '1') == '1'
+MAX_CONVERSIONS_KEPT = 100
+
+
+def matching_specs(filename):
+    """Specs of the campaigns whose file rules match an uploaded file name"""
+    specs = [load_spec(campaign) for campaign in available_specs()]
+    return [spec for spec in specs if matches(spec, filename)]
+
+
+def convert(path, specs):
+    """Parse an upload once per matching campaign mapping; the frames land in the input cache"""
+    for spec in specs:
+        for _ in iter_source(path, spec, input_columns(spec)):
+            pass
+
+
+class UploadConverter:
+    """Converts uploads on one background thread and keeps the recent results"""
+
+    def __init__(self):
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='pds-convert')
+        self._conversions = OrderedDict()  # file name -> status dict
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return CONVERT_ON_UPLOAD and pds_input_cache.enabled()
+
+    def submit(self, path, campaigns=None):
+        """Queue a saved upload; returns the campaigns it is converted for ([] if none).
+
+        ``campaigns`` are the campaigns the file is routed to (from the uploads
+        index); without them the filename rules are checked here.
+        """
+        if not self.enabled:
+            return []
+        filename = os.path.basename(path)
+        try:
+            if campaigns is None:
+                specs = matching_specs(filename)
+            else:
+                specs = [load_spec(campaign) for campaign in campaigns]
+        except Exception:
+            return []
+        if not specs:
+            return []
+
+        campaigns = [spec['campaign'] for spec in specs]
+        with self._lock:
+            self._conversions.pop(filename, None)
+            self._conversions[filename] = {
+                'file': filename,
+                'campaigns': campaigns,
+                'status': 'queued',
+                'created': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            }
+            while len(self._conversions) > MAX_CONVERSIONS_KEPT:
+                self._conversions.popitem(last=False)
+        self._executor.submit(self._run, path, specs)
+        return campaigns
+
+    def _update(self, filename, **values):
+        with self._lock:
+            if filename in self._conversions:
+                self._conversions[filename].update(values)
+
+    def _run(self, path, specs):
+        filename = os.path.basename(path)
+        self._update(filename, status='running')
+        start = time.perf_counter()
+        try:
+            convert(path, specs)
+            self._update(filename, status='ready', duration=round(time.perf_counter() - start, 3))
+        except Exception as e:
+            # /run will parse the file itself and report the problem properly
+            self._update(filename, status='error', error=str(e), duration=round(time.perf_counter() - start, 3))
+
+    def recent(self):
+        with self._lock:
+            return [dict(status) for status in reversed(self._conversions.values())]
@@ -0,0 +1,285 @@
+"""
+In-process runner for the PDS campaign scripts.
+
+Campaign scripts expose a ``main()`` function. Running them inside the Flask
+process keeps pandas imported and the parsed templates cached between runs,
+instead of paying interpreter start-up on every click. Subprocess isolation is
+still available per run (``isolated=True``) or globally (``PDS_ISOLATED=1``).
+
+``run_campaigns`` runs a batch at the same time on a process pool sized to the
+host's cores (override with ``PDS_MAX_WORKERS``).
+"""
+
+import atexit
+import importlib
+import io
+import multiprocessing
+import os
+import subprocess
+import sys
+import threading
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+SCRIPTS_DIR = os.path.join(BASE_DIR, "PDS TEMPLATES", "SCRIPTS")
+
+if SCRIPTS_DIR not in sys.path:
+    sys.path.insert(0, SCRIPTS_DIR)
+
+ISOLATED_DEFAULT = os.environ.get('PDS_ISOLATED', '0') == '1'
+MAX_WORKERS = int(os.environ.get('PDS_MAX_WORKERS', 0)) or os.cpu_count() or 1
+
+
+class _ThreadStream(io.TextIOBase):
+    """Stream that sends writes to the current thread's capture buffer, if any"""
+
+    def __init__(self, fallback):
+        self._fallback = fallback
+        self._local = threading.local()
+
+    @property
+    def encoding(self):
+        return 'utf-8'
+
+    def capture(self, target):
+        self._local.target = target
+
+    def release(self):
+        self._local.target = None
+
+    def writable(self):
+        return True
+
+    def write(self, s):
+        target = getattr(self._local, 'target', None)
+        if target is None:
+            return self._fallback.write(s)
+        return target.write(s)
+
+    def flush(self):
+        target = getattr(self._local, 'target', None)
+        (target or self._fallback).flush()
+
+
+class _Tee(io.TextIOBase):
+    """Keeps the full text of a stream and forwards each write to a callback"""
+
+    def __init__(self, name, on_output=None):
+        self.name = name
+        self._buffer = io.StringIO()
+        self._on_output = on_output
+
+    def writable(self):
+        return True
+
+    def write(self, s):
+        self._buffer.write(s)
+        if self._on_output and s:
+            self._on_output(self.name, s)
+        return len(s)
+
+    def getvalue(self):
+        return self._buffer.getvalue()
+
+
+_install_lock = threading.Lock()
+_module_lock = threading.Lock()
+_loaded = {}  # campaign -> (module, script mtime)
+
+
+def _install_streams():
+    """Swap sys.stdout/sys.stderr for thread-aware streams (once per process)"""
+    with _install_lock:
+        if not isinstance(sys.stdout, _ThreadStream):
+            sys.stdout = _ThreadStream(sys.stdout)
+        if not isinstance(sys.stderr, _ThreadStream):
+            sys.stderr = _ThreadStream(sys.stderr)
+
+
+def script_path(campaign_name):
+    return os.path.join(SCRIPTS_DIR, f"{campaign_name.lower()}.py")
+
+
+def _load_campaign(campaign_name):
+    """Import a campaign script, reloading it if the file changed on disk"""
+    module_name = campaign_name.lower()
+    mtime = os.path.getmtime(script_path(campaign_name))
+    with _module_lock:
+        cached = _loaded.get(module_name)
+        if cached and cached[1] == mtime:
+            return cached[0]
+        if cached:
+            module = importlib.reload(cached[0])
+        else:
+            module = importlib.import_module(module_name)
+        _loaded[module_name] = (module, mtime)
+        return module
+
+
+def _run_in_process(campaign_name, stdout, stderr, argv=None):
+    _install_streams()
+    sys.stdout.capture(stdout)
+    sys.stderr.capture(stderr)
+    try:
+        module = _load_campaign(campaign_name)
+        returncode = module.main() if argv is None else module.main(argv)
+        return 0 if returncode is None else int(returncode)
+    except SystemExit as e:
+        if e.code is None or isinstance(e.code, int):
+            return e.code or 0
+        stderr.write(f"{e.code}\n")
+        return 1
+    except Exception:
+        traceback.print_exc(file=stderr)
+        return 1
+    finally:
+        sys.stdout.release()
+        sys.stderr.release()
+
+
+def _pump(pipe, sink):
+    for line in iter(pipe.readline, ''):
+        sink.write(line)
+    pipe.close()
+
+
+def _run_subprocess(campaign_name, stdout, stderr, argv=None):
+    env = os.environ.copy()
+    env['PYTHONPATH'] = SCRIPTS_DIR
+    env['PYTHONUNBUFFERED'] = '1'  # so output can be streamed while the script runs
+    process = subprocess.Popen(
+        [sys.executable, script_path(campaign_name)] + list(argv or []),
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+        encoding='utf-8',
+        errors='replace',
+        cwd=SCRIPTS_DIR,
+        env=env
+    )
+    err_thread = threading.Thread(target=_pump, args=(process.stderr, stderr), daemon=True)
+    err_thread.start()
+    _pump(process.stdout, stdout)
+    err_thread.join()
+    return process.wait()
+
+
+def run_campaign(campaign_name, isolated=None, on_output=None, argv=None):
+    """Run one campaign script and return its exit code and captured output.
+
+    ``on_output(stream_name, text)`` is called as output is produced, for live streaming.
+    ``argv`` is passed to the script's ``main(argv)`` (command-line arguments when isolated).
+    """
+    if isolated is None:
+        isolated = ISOLATED_DEFAULT
+
+    stdout, stderr = _Tee('stdout', on_output), _Tee('stderr', on_output)
+    started = datetime.now()
+    start = time.perf_counter()
+
+    if isolated:
+        returncode = _run_subprocess(campaign_name, stdout, stderr, argv)
+    else:
+        returncode = _run_in_process(campaign_name, stdout, stderr, argv)
+
+    return {
+        'campaign': campaign_name,
+        'script': script_path(campaign_name),
+        'mode': 'subprocess' if isolated else 'in-process',
+        'returncode': returncode,
+        'stdout': stdout.getvalue(),
+        'stderr': stderr.getvalue(),
+        'started': started.strftime('%Y-%m-%d %H:%M:%S'),
+        'duration': round(time.perf_counter() - start, 3),
+    }
+
+
+def write_run_log(result, output_dir):
+    """Save a run result as a timestamped log file in the PDS OUTPUT folder"""
+    os.makedirs(output_dir, exist_ok=True)
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    log_path = os.path.join(output_dir, f"{result['campaign']}_{timestamp}.log")
+
+    with open(log_path, 'w', encoding='utf-8') as log_file:
+        log_file.write(f"Campaign: {result['campaign']}\n")
+        log_file.write(f"Script: {result['script']}\n")
+        log_file.write(f"Working Directory: {SCRIPTS_DIR}\n")
+        log_file.write(f"Execution Time: {result['started']}\n")
+        log_file.write(f"Mode: {result['mode']}\n")
+        log_file.write(f"Duration: {result['duration']}s\n")
+        log_file.write(f"Return Code: {result['returncode']}\n")
+        log_file.write("=" * 50 + "\n")
+        log_file.write("STDOUT:\n")
+        log_file.write(result['stdout'] if result['stdout'] else "(No output)")
+        log_file.write("\n" + "=" * 50 + "\n")
+        log_file.write("STDERR:\n")
+        log_file.write(result['stderr'] if result['stderr'] else "(No errors)")
+
+    return log_path
+
+
+# =====================================
+# 🚀 PARALLEL BATCH RUNS
+# =====================================
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool():
+    """Long-lived worker pool; workers keep their imported scripts warm between batches"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=MAX_WORKERS,
+                mp_context=multiprocessing.get_context('spawn')
+            )
+            atexit.register(_pool.shutdown, wait=False, cancel_futures=True)
+        return _pool
+
+
+def _discard_pool(pool):
+    """Drop a broken pool so the next batch starts fresh workers"""
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def run_campaigns(campaign_names, output_dir, isolated=None):
+    """Run several campaigns at once on the worker pool and log each one"""
+    start = time.perf_counter()
+    pool = _get_pool()
+    futures = [(name, pool.submit(run_campaign, name, isolated)) for name in campaign_names]
+
+    results = []
+    for name, future in futures:
+        try:
+            result = future.result()
+        except Exception as e:
+            # The worker itself died (e.g. killed for memory); report it like a failed run
+            if isinstance(e, BrokenProcessPool):
+                _discard_pool(pool)
+            result = {
+                'campaign': name,
+                'script': script_path(name),
+                'mode': 'pool',
+                'returncode': 1,
+                'stdout': '',
+                'stderr': f"Worker failed: {e}",
+                'started': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                'duration': 0,
+            }
+        result['log_file'] = write_run_log(result, output_dir)
+        results.append(result)
+
+    return {
+        'results': results,
+        'workers': min(MAX_WORKERS, len(campaign_names)),
+        'duration': round(time.perf_counter() - start, 3),
+    }
@@ -0,0 +1,159 @@
+"""
+Background job queue for PDS campaign runs.
+
+``/run/<campaign>`` keeps the HTTP request open until the script finishes.
+Jobs submitted here run on a small thread pool instead; the browser gets a job
+ID right away and follows the script output over Server-Sent Events.
+"""
+
+import json
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import pds_engine
+
+MAX_JOBS_KEPT = 100      # finished jobs kept for status lookups
+KEEPALIVE_SECONDS = 15   # SSE comment sent while a script is quiet
+
+
+class Job:
+    """One queued or running campaign script"""
+
+    def __init__(self, campaign, isolated=None):
+        self.id = uuid.uuid4().hex[:12]
+        self.campaign = campaign
+        self.isolated = isolated
+        self.status = 'queued'
+        self.lines = []          # output lines; SSE event ids are indexes into this list
+        self.result = None
+        self.log_file = None
+        self.error = None
+        self.created = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        self._partial = {'stdout': '', 'stderr': ''}
+        self._cond = threading.Condition()
+
+    @property
+    def finished(self):
+        return self.status in ('success', 'error')
+
+    def _on_output(self, stream_name, text):
+        """Split streamed text into complete lines and wake up SSE listeners"""
+        with self._cond:
+            buffered = self._partial[stream_name] + text
+            *complete, self._partial[stream_name] = buffered.split('\n')
+            prefix = '' if stream_name == 'stdout' else '[stderr] '
+            self.lines.extend(prefix + line for line in complete)
+            if complete:
+                self._cond.notify_all()
+
+    def _finish(self, status):
+        with self._cond:
+            for stream_name, rest in self._partial.items():
+                if rest:
+                    prefix = '' if stream_name == 'stdout' else '[stderr] '
+                    self.lines.append(prefix + rest)
+            self._partial = {'stdout': '', 'stderr': ''}
+            self.status = status
+            self._cond.notify_all()
+
+    def wait_for_lines(self, since, timeout):
+        """Block until there are lines past ``since`` or the job finishes"""
+        with self._cond:
+            self._cond.wait_for(lambda: len(self.lines) > since or self.finished, timeout=timeout)
+            return self.lines[since:], self.finished
+
+    def to_dict(self, include_output=False):
+        data = {
+            'job_id': self.id,
+            'campaign': self.campaign,
+            'status': self.status,
+            'created': self.created,
+            'lines': len(self.lines),
+            'log_file': self.log_file,
+        }
+        if self.result:
+            data.update({
+                'return_code': self.result['returncode'],
+                'duration': self.result['duration'],
+                'mode': self.result['mode'],
+            })
+        if self.error:
+            data['error'] = self.error
+        if include_output and self.result:
+            data['output'] = self.result['stdout']
+            data['error'] = self.result['stderr'] or self.error or ''
+        if self.finished:
+            data['message'] = (f'{self.campaign} script completed successfully' if self.status == 'success'
+                               else f'{self.campaign} script failed')
+        return data
+
+
+class JobQueue:
+    """Runs campaign jobs on background threads and keeps recent jobs for lookup"""
+
+    def __init__(self, max_workers=None):
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers or pds_engine.MAX_WORKERS,
+            thread_name_prefix='pds-job'
+        )
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+
+    def submit(self, campaign, output_dir, isolated=None):
+        job = Job(campaign, isolated)
+        with self._lock:
+            self._jobs[job.id] = job
+            self._prune()
+        self._executor.submit(self._run, job, output_dir)
+        return job
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def recent(self):
+        with self._lock:
+            return list(reversed(self._jobs.values()))
+
+    def _prune(self):
+        finished = [job_id for job_id, job in self._jobs.items() if job.finished]
+        for job_id in finished[:max(0, len(self._jobs) - MAX_JOBS_KEPT)]:
+            del self._jobs[job_id]
+
+    def _run(self, job, output_dir):
+        job.status = 'running'
+        try:
+            job.result = pds_engine.run_campaign(job.campaign, isolated=job.isolated, on_output=job._on_output)
+            job.log_file = pds_engine.write_run_log(job.result, output_dir)
+            job._finish('success' if job.result['returncode'] == 0 else 'error')
+        except Exception as e:
+            job.error = str(e)
+            job._finish('error')
+
+
+def sse_message(event, data, event_id=None):
+    """One Server-Sent Events message"""
+    message = f"event: {event}\n"
+    if event_id is not None:
+        message += f"id: {event_id}\n"
+    for line in str(data).split('\n'):
+        message += f"data: {line}\n"
+    return message + "\n"
+
+
+def stream_events(job, since=0):
+    """Server-Sent Events for a job: one ``output`` event per line, then ``done``"""
+    position = since
+    while True:
+        lines, finished = job.wait_for_lines(position, timeout=KEEPALIVE_SECONDS)
+        for line in lines:
+            position += 1
+            yield sse_message('output', line, event_id=position)
+        if finished and position >= len(job.lines):
+            yield sse_message('done', json.dumps(job.to_dict(include_output=True)))
+            return
+        if not lines:
+            yield ": keep-alive\n\n"
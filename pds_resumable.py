@@ -0,0 +1,256 @@
+"""
+Chunked, resumable uploads for large endorsement files.
+
+The browser starts a session with the file's name and size, then PUTs the
+file in chunks (several at once); each chunk is streamed from the request
+straight to its offset in ``uploads/.store/partial/<id>.part``, so neither the
+whole file nor a whole multipart body is held in memory. The SHA-256 of the
+file advances as soon as the next chunk in order has arrived, so it is ready
+when the last chunk lands. Sessions are written to ``<id>.json`` next to the
+part file: after a dropped connection (or a server restart) the browser asks
+which chunks are there and sends only the missing ones.
+
+Completing a session hands the file to the uploads store (pds_uploads), which
+dedupes it by content like any other upload.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+import uuid
+from datetime import datetime
+
+import pds_engine  # noqa: F401 (puts the PDS scripts on sys.path)
+from pds_uploads import STORE_DIRNAME, get_index
+
+CHUNK_BYTES = int(float(os.environ.get('PDS_UPLOAD_CHUNK_MB') or 8) * 1024 * 1024)
+MAX_CHUNK_BYTES = 64 * 1024 * 1024
+MAX_UPLOAD_BYTES = int(float(os.environ.get('PDS_UPLOAD_MAX_MB') or 2048) * 1024 * 1024)
+BLOCK_BYTES = 1024 * 1024
+SESSION_TTL_SECONDS = 24 * 60 * 60   # unfinished sessions older than this are removed
+PARTIAL_DIRNAME = 'partial'
+
+
+class ChunkedUpload:
+    """One file being uploaded in chunks"""
+
+    def __init__(self, folder, id, filename, size, chunk_size, key, received=(), created=None):
+        self.id = id
+        self.filename = filename
+        self.size = size
+        self.chunk_size = chunk_size
+        self.key = key
+        self.received = set(received)
+        self.created = created or datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        self.part_path = os.path.join(folder, f"{id}.part")
+        self.manifest_path = os.path.join(folder, f"{id}.json")
+        self._digest = hashlib.sha256()
+        self._hashed = 0   # bytes from the start of the file that are in _digest
+        self._writing = set()   # chunks being written right now
+        self._lock = threading.Lock()
+
+    @property
+    def chunk_count(self):
+        return -(-self.size // self.chunk_size)
+
+    def chunk_length(self, index):
+        return min(self.chunk_size, self.size - index * self.chunk_size)
+
+    def missing(self):
+        return [index for index in range(self.chunk_count) if index not in self.received]
+
+    def status(self):
+        with self._lock:
+            return {
+                'upload_id': self.id,
+                'filename': self.filename,
+                'size': self.size,
+                'chunk_size': self.chunk_size,
+                'chunk_count': self.chunk_count,
+                'received': sorted(self.received),
+                'missing': self.missing(),
+                'hashed_bytes': self._hashed,
+                'created': self.created,
+            }
+
+    def _save(self):
+        manifest = {'id': self.id, 'filename': self.filename, 'size': self.size, 'chunk_size': self.chunk_size,
+                    'key': self.key, 'received': sorted(self.received), 'created': self.created}
+        tmp_path = f"{self.manifest_path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(manifest, f)
+        os.replace(tmp_path, self.manifest_path)
+
+    def write(self, index, stream, sha256=None):
+        """Stream one chunk to its place in the part file; sha256, if given, is checked.
+
+        A chunk that has already arrived is not written again (False): its bytes
+        may already be in the running SHA-256, and a bad re-send must not replace
+        them. One that is still arriving in another request is refused, to be retried.
+        """
+        if not 0 <= index < self.chunk_count:
+            raise ValueError(f'Chunk {index} is out of range (0-{self.chunk_count - 1})')
+        with self._lock:
+            if index in self.received:
+                return False
+            if index in self._writing:
+                raise ValueError(f'Chunk {index} is already being uploaded')
+            self._writing.add(index)
+        try:
+            self._write(index, stream, sha256)
+        finally:
+            with self._lock:
+                self._writing.discard(index)
+        return True
+
+    def _write(self, index, stream, sha256):
+        expected = self.chunk_length(index)
+        digest, written = hashlib.sha256(), 0
+        with open(self.part_path, 'r+b') as f:
+            f.seek(index * self.chunk_size)
+            for block in iter(lambda: stream.read(BLOCK_BYTES), b''):
+                written += len(block)
+                if written > expected:
+                    break
+                digest.update(block)
+                f.write(block)
+        if written != expected:
+            raise ValueError(f'Chunk {index} should be {expected} bytes, got {written}')
+        if sha256 and digest.hexdigest() != sha256.lower():
+            raise ValueError(f'Chunk {index} does not match its SHA-256')
+
+        with self._lock:
+            self.received.add(index)
+            self._advance()
+            self._save()
+
+    def _advance(self):
+        """Hash the chunks that now continue the hashed prefix of the file"""
+        with open(self.part_path, 'rb') as f:
+            while self._hashed < self.size and self._hashed // self.chunk_size in self.received:
+                f.seek(self._hashed)
+                remaining = self.chunk_length(self._hashed // self.chunk_size)
+                while remaining:
+                    block = f.read(min(BLOCK_BYTES, remaining))
+                    self._digest.update(block)
+                    remaining -= len(block)
+                self._hashed = min(self.size, self._hashed + self.chunk_size)
+
+    def finish(self):
+        """SHA-256 of the whole file once every chunk is in"""
+        with self._lock:
+            missing = self.missing()
+            if missing:
+                raise ValueError(f'{len(missing)} chunk(s) still missing')
+            self._advance()
+            return self._digest.hexdigest()
+
+    def remove(self):
+        for path in (self.part_path, self.manifest_path):
+            if os.path.exists(path):
+                os.remove(path)
+
+
+class ChunkedUploads:
+    """Chunked upload sessions of one uploads folder"""
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.folder = os.path.join(directory, STORE_DIRNAME, PARTIAL_DIRNAME)
+        self._sessions = None   # id -> ChunkedUpload, loaded from the manifests on first use
+        self._lock = threading.Lock()
+
+    def _load(self):
+        if self._sessions is not None:
+            return
+        self._sessions = {}
+        os.makedirs(self.folder, exist_ok=True)
+        for name in os.listdir(self.folder):
+            if not name.endswith('.json'):
+                continue
+            try:
+                with open(os.path.join(self.folder, name)) as f:
+                    manifest = json.load(f)
+            except (OSError, ValueError):
+                continue
+            session = ChunkedUpload(self.folder, **manifest)
+            if os.path.exists(session.part_path):
+                self._sessions[session.id] = session
+
+    def _expire(self):
+        cutoff = time.time() - SESSION_TTL_SECONDS
+        for id, session in list(self._sessions.items()):
+            try:
+                stale = os.path.getmtime(session.manifest_path) < cutoff
+            except OSError:
+                stale = True
+            if stale:
+                session.remove()
+                del self._sessions[id]
+
+    def start(self, filename, size, key=None, chunk_size=None):
+        """New session, or the unfinished one for the same file (same key) so it can resume"""
+        if size < 0:
+            raise ValueError('File size must not be negative')
+        if size > MAX_UPLOAD_BYTES:
+            raise ValueError(f'File is larger than the {MAX_UPLOAD_BYTES // (1024 * 1024)} MB upload limit')
+        key = key or f'{filename}:{size}'
+        chunk_size = min(max(int(chunk_size or CHUNK_BYTES), BLOCK_BYTES), MAX_CHUNK_BYTES)
+        with self._lock:
+            self._load()
+            self._expire()
+            for session in self._sessions.values():
+                if session.key == key and session.filename == filename and session.size == size:
+                    return session
+
+            if shutil.disk_usage(self.folder).free < size:
+                raise ValueError('Not enough disk space for this file')
+            session = ChunkedUpload(self.folder, uuid.uuid4().hex[:12], filename, size, chunk_size, key)
+            try:
+                with open(session.part_path, 'wb') as f:
+                    f.truncate(size)
+                session._save()
+            except OSError as e:
+                session.remove()
+                raise ValueError(f'Could not set up the upload: {e}')
+            self._sessions[session.id] = session
+            return session
+
+    def get(self, id):
+        with self._lock:
+            self._load()
+            return self._sessions.get(id)
+
+    def complete(self, id, numbered=True):
+        """Put a finished session's file into the uploads store; returns (entry, duplicate).
+
+        The session is taken out first, so a second complete of the same upload
+        (a retried request) gets KeyError instead of a part file that is gone.
+        """
+        with self._lock:
+            self._load()
+            session = self._sessions.pop(id, None)
+        if session is None:
+            raise KeyError(id)
+        try:
+            sha256 = session.finish()
+        except ValueError:
+            with self._lock:
+                self._sessions[id] = session   # chunks still missing: the upload goes on
+            raise
+        try:
+            return get_index(self.directory).store_file(session.part_path, session.filename, sha256, numbered)
+        except FileNotFoundError:
+            raise KeyError(id)   # removed meanwhile (expired, or completed by another process)
+        finally:
+            session.remove()
+
+    def abort(self, id):
+        with self._lock:
+            self._load()
+            session = self._sessions.pop(id, None)
+        if session:
+            session.remove()
@@ -0,0 +1,374 @@
+"""
+Task progress in SQLite.
+
+``progress_data.json`` used to be read whole and rewritten whole on every
+click, with nothing stopping two agents from overwriting each other's update
+and a crash mid-write leaving a file that reset every task to PENDING. Now
+every change is an event appended to the ``events`` table of
+``progress_data.db`` (WAL mode): when, which task, old and new status, who.
+The ``tasks`` table is a snapshot of the state up to the event recorded in
+``meta.snapshot_event``; the current state is that snapshot with the later
+events replayed on top. Every ``COMPACT_EVENTS`` events (and at startup) the
+snapshot is brought up to date. The events themselves are kept, so
+``history()`` shows when each lender went PENDING → DOWNLOADED → PROCESSED →
+UPLOADED.
+
+``ProgressStore`` keeps the current state in memory: the dashboard, the
+payment reminders and ``/update_task`` work on it under one lock, and new
+events are appended behind, together in one transaction, at most
+``PROGRESS_FLUSH_SECONDS`` later (and at shutdown). Commits by another process
+(``PRAGMA data_version``) make the next read reload from the database.
+
+Every change also bumps a revision number, and each task remembers the
+revision it last changed at, so ``changes(since)`` returns just the tasks a
+dashboard hasn't seen and ``wait()`` blocks until there is something new. The
+revision counts from the last event id at startup; ``epoch`` identifies this
+process's numbering, so a client that polled another process or a previous
+start gets the full state.
+
+On first use an existing ``progress_data.json`` is imported, and tasks for
+categories added to ``TASK_CATEGORIES`` later are created as PENDING.
+"""
+
+import atexit
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import date, datetime
+
+BUSY_TIMEOUT_MS = 5000
+FLUSH_SECONDS = float(os.environ.get('PROGRESS_FLUSH_SECONDS') or 1.0)
+COMPACT_EVENTS = 500   # events after the snapshot before it is brought up to date
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    key TEXT PRIMARY KEY,
+    category TEXT NOT NULL,
+    name TEXT NOT NULL,
+    status TEXT NOT NULL,
+    assigned_to TEXT NOT NULL DEFAULT '',
+    notes TEXT NOT NULL DEFAULT '',
+    last_updated TEXT NOT NULL,
+    position INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    at TEXT NOT NULL,
+    task_key TEXT NOT NULL,
+    action TEXT NOT NULL,
+    old_status TEXT,
+    new_status TEXT NOT NULL,
+    assigned_to TEXT NOT NULL DEFAULT '',
+    notes TEXT NOT NULL DEFAULT '',
+    changed_by TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS events_task ON events (task_key, id);
+"""
+
+TASK_FIELDS = ('category', 'name', 'status', 'assigned_to', 'last_updated', 'notes')
+EVENT_FIELDS = ('at', 'task_key', 'action', 'old_status', 'new_status', 'assigned_to', 'notes', 'changed_by')
+
+
+def _now():
+    return datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+
+
+def _apply(tasks, event):
+    """Replay one event onto {key: task}"""
+    task = tasks.get(event['task_key'])
+    if task is None:
+        return
+    task.update(status=event['new_status'], assigned_to=event['assigned_to'], notes=event['notes'])
+    if event['action'] != 'reset':   # resetting never changed a task's last_updated
+        task['last_updated'] = event['at']
+
+
+def _unchanged(task, status, assigned_to, notes):
+    """Whether an update would leave the task as it is"""
+    return (task.get('status'), task.get('assigned_to') or '', task.get('notes') or '') == (status, assigned_to or '', notes or '')
+
+
+class ProgressStore:
+    """Dashboard tasks: a snapshot plus an event log on disk, the current state in memory"""
+
+    def __init__(self, path, categories, legacy_json=None):
+        self.path = path
+        self.categories = categories
+        self.legacy_json = legacy_json
+        self._lock = threading.RLock()
+        self._tasks = {}            # key -> task dict, in dashboard order
+        self._last_updated = ''
+        self._pending = []          # events applied in memory but not appended yet
+        self._timer = None
+        self._data_version = None
+        self.epoch = uuid.uuid4().hex[:8]
+        self._revision = 0
+        self._task_revisions = {}   # key -> revision of the task's last change
+        self._changed_cond = threading.Condition(self._lock)
+        self._conn = sqlite3.connect(path, timeout=BUSY_TIMEOUT_MS / 1000, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute(f'PRAGMA busy_timeout={BUSY_TIMEOUT_MS}')
+        self._setup()
+        atexit.register(self.flush)
+
+    def _setup(self):
+        conn = self._conn
+        conn.executescript(SCHEMA)
+        with conn:
+            conn.execute('BEGIN IMMEDIATE')
+            if conn.execute('SELECT COUNT(*) FROM tasks').fetchone()[0] == 0:
+                self._import_json(conn)
+            self._add_missing_tasks(conn)
+            self._compact(conn)
+        self._load()
+
+    def _import_json(self, conn):
+        """Copy the tasks of the old progress_data.json, if there is a readable one"""
+        if not self.legacy_json or not os.path.exists(self.legacy_json):
+            return
+        try:
+            with open(self.legacy_json, 'r') as f:
+                data = json.load(f)
+            tasks = data['tasks']
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            print(f"⚠️ Could not import {self.legacy_json}: {e}")
+            return
+        conn.executemany(
+            'INSERT OR IGNORE INTO tasks (key, category, name, status, assigned_to, notes, last_updated, position) '
+            'VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+            [(key, task.get('category', ''), task.get('name', ''), task.get('status', 'PENDING'),
+              task.get('assigned_to', ''), task.get('notes', ''), task.get('last_updated', ''), position)
+             for position, (key, task) in enumerate(tasks.items())])
+        if data.get('last_updated'):
+            self._write_meta(conn, 'last_updated', data['last_updated'])
+        print(f"📦 Imported {len(tasks)} tasks from {self.legacy_json} into {self.path}")
+
+    def _add_missing_tasks(self, conn):
+        today = date.today().strftime('%Y-%m-%d')
+        position = conn.execute('SELECT COALESCE(MAX(position), -1) FROM tasks').fetchone()[0]
+        for category, items in self.categories.items():
+            for item in items:
+                position += 1
+                conn.execute(
+                    'INSERT OR IGNORE INTO tasks (key, category, name, status, last_updated, position) '
+                    "VALUES (?, ?, ?, 'PENDING', ?, ?)",
+                    (f"{category}_{item}", category, item, today, position))
+        if self._read_meta(conn, 'last_updated') is None:
+            self._write_meta(conn, 'last_updated', today)
+
+    def _read_meta(self, conn, key):
+        row = conn.execute('SELECT value FROM meta WHERE key = ?', (key,)).fetchone()
+        return row[0] if row else None
+
+    def _write_meta(self, conn, key, value):
+        conn.execute('INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)', (key, str(value)))
+
+    def _events_after_snapshot(self, conn):
+        snapshot_event = int(self._read_meta(conn, 'snapshot_event') or 0)
+        return conn.execute('SELECT id, ' + ', '.join(EVENT_FIELDS) + ' FROM events WHERE id > ? ORDER BY id',
+                            (snapshot_event,)).fetchall()
+
+    def _compact(self, conn):
+        """Fold the events since the snapshot into the tasks table (inside the caller's transaction)"""
+        events = self._events_after_snapshot(conn)
+        if not events:
+            return
+        tasks = {row['key']: {field: row[field] for field in TASK_FIELDS}
+                 for row in conn.execute('SELECT key, ' + ', '.join(TASK_FIELDS) + ' FROM tasks')}
+        changed = set()
+        for event in events:
+            _apply(tasks, event)
+            changed.add(event['task_key'])
+        conn.executemany(
+            'UPDATE tasks SET status = ?, assigned_to = ?, notes = ?, last_updated = ? WHERE key = ?',
+            [(tasks[key]['status'], tasks[key]['assigned_to'], tasks[key]['notes'], tasks[key]['last_updated'], key)
+             for key in changed if key in tasks])
+        self._write_meta(conn, 'snapshot_event', events[-1]['id'])
+
+    def _load(self):
+        """Snapshot plus the events after it, plus the events not appended yet"""
+        conn = self._conn
+        with conn:
+            conn.execute('BEGIN')
+            rows = conn.execute('SELECT key, ' + ', '.join(TASK_FIELDS) + ' FROM tasks ORDER BY position').fetchall()
+            events = self._events_after_snapshot(conn)
+            last_updated = self._read_meta(conn, 'last_updated')
+        tasks = {row['key']: {field: row[field] for field in TASK_FIELDS} for row in rows}
+        for event in list(events) + self._pending:
+            _apply(tasks, event)
+        if self._data_version is None:
+            self._revision = conn.execute('SELECT COALESCE(MAX(id), 0) FROM events').fetchone()[0]
+            self._task_revisions = dict.fromkeys(tasks, 0)
+        else:
+            changed = [key for key, task in tasks.items() if task != self._tasks.get(key)]
+            self._bump(changed)
+        self._tasks = tasks
+        if not self._pending:
+            self._last_updated = last_updated or ''
+        self._data_version = conn.execute('PRAGMA data_version').fetchone()[0]
+
+    def _reload_if_changed(self):
+        # data_version only moves when another connection (another process) commits
+        if self._conn.execute('PRAGMA data_version').fetchone()[0] != self._data_version:
+            self._load()
+
+    def _bump(self, keys):
+        for key in keys:
+            self._revision += 1
+            self._task_revisions[key] = self._revision
+        if keys:
+            self._changed_cond.notify_all()
+
+    def snapshot(self):
+        """{'last_updated': ..., 'tasks': {key: task}} in the shape progress_data.json had, plus revision and epoch"""
+        with self._lock:
+            self._reload_if_changed()
+            return {
+                'last_updated': self._last_updated,
+                'tasks': {key: dict(task) for key, task in self._tasks.items()},
+                'revision': self._revision,
+                'epoch': self.epoch,
+            }
+
+    @property
+    def revision(self):
+        with self._lock:
+            self._reload_if_changed()
+            return self._revision
+
+    def changes(self, since=None, epoch=None):
+        """Tasks changed after revision ``since`` (all of them if since/epoch aren't this numbering's)"""
+        with self._lock:
+            self._reload_if_changed()
+            full = since is None or epoch != self.epoch or since > self._revision
+            return {
+                'epoch': self.epoch,
+                'revision': self._revision,
+                'full': full,
+                'last_updated': self._last_updated,
+                'tasks': {key: dict(task) for key, task in self._tasks.items()
+                          if full or self._task_revisions.get(key, 0) > since},
+            }
+
+    def wait(self, since, epoch=None, timeout=25):
+        """Block until the revision moves past ``since`` (or the epoch differs), at most timeout seconds"""
+        deadline = time.monotonic() + timeout
+        with self._lock:
+            while True:
+                self._reload_if_changed()
+                remaining = deadline - time.monotonic()
+                if epoch != self.epoch or self._revision != since or remaining <= 0:
+                    return self._revision
+                # wake up at least every second to notice commits by other processes
+                self._changed_cond.wait(min(remaining, 1.0))
+
+    def update_task(self, key, status, assigned_to='', notes='', changed_by=''):
+        """Set one task; False if there is no such task"""
+        with self._lock:
+            self._reload_if_changed()
+            task = self._tasks.get(key)
+            if task is None:
+                return False
+            if _unchanged(task, status, assigned_to, notes):
+                return True   # nothing to log, and watchers have nothing to fetch
+            self._record([(key, task['status'])], 'update', status, assigned_to, notes, changed_by)
+        return True
+
+    def reset_all(self, changed_by=''):
+        """Every task back to PENDING, unassigned and without notes"""
+        with self._lock:
+            self._reload_if_changed()
+            tasks = [(key, task['status']) for key, task in self._tasks.items()
+                     if not _unchanged(task, 'PENDING', '', '')]
+            if tasks:
+                self._record(tasks, 'reset', 'PENDING', '', '', changed_by)
+
+    def _record(self, tasks, action, status, assigned_to, notes, changed_by):
+        now = _now()
+        for key, old_status in tasks:
+            event = {'at': now, 'task_key': key, 'action': action, 'old_status': old_status, 'new_status': status,
+                     'assigned_to': assigned_to or '', 'notes': notes or '', 'changed_by': changed_by or ''}
+            _apply(self._tasks, event)
+            self._pending.append(event)
+        self._last_updated = now
+        self._bump([key for key, _ in tasks])
+        if self._timer is None:
+            self._schedule_flush()
+
+    def _schedule_flush(self):
+        self._timer = threading.Timer(FLUSH_SECONDS, self.flush)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def flush(self):
+        """Append the new events (and compact the snapshot when enough have piled up) in one transaction"""
+        with self._lock:
+            self._timer = None
+            if not self._pending:
+                return
+            try:
+                self._write(self._pending)
+            except sqlite3.IntegrityError as e:
+                # one bad event must not hold back every later change: save the rest without it
+                print(f"⚠️ Task progress rejected by the database ({e}), saving changes one by one")
+                self._write_each()
+                return
+            except sqlite3.Error as e:
+                print(f"⚠️ Could not save task progress, retrying: {e}")
+                self._schedule_flush()
+                return
+            self._pending = []
+
+    def _write(self, events):
+        with self._conn:
+            self._conn.executemany(
+                'INSERT INTO events (' + ', '.join(EVENT_FIELDS) + ') VALUES (' + ', '.join('?' * len(EVENT_FIELDS)) + ')',
+                [tuple(event[field] for field in EVENT_FIELDS) for event in events])
+            self._write_meta(self._conn, 'last_updated', self._last_updated)
+            snapshot_event = int(self._read_meta(self._conn, 'snapshot_event') or 0)
+            count = self._conn.execute('SELECT COUNT(*) FROM events WHERE id > ?', (snapshot_event,)).fetchone()[0]
+            if count >= COMPACT_EVENTS:
+                self._compact(self._conn)
+
+    def _write_each(self):
+        """Save pending events one at a time, dropping those the database rejects"""
+        while self._pending:
+            event = self._pending[0]
+            try:
+                self._write([event])
+            except sqlite3.IntegrityError as e:
+                print(f"❌ Dropped task change {event['task_key']} -> {event['new_status']!r}: {e}")
+            except sqlite3.Error as e:
+                print(f"⚠️ Could not save task progress, retrying: {e}")
+                self._schedule_flush()
+                return
+            self._pending.pop(0)
+
+    def compact(self):
+        """Bring the snapshot up to date with every event"""
+        with self._lock:
+            self.flush()
+            with self._conn:
+                self._conn.execute('BEGIN IMMEDIATE')
+                self._compact(self._conn)
+
+    def history(self, task_key=None, limit=100):
+        """Most recent events first, for one task or all of them"""
+        with self._lock:
+            self.flush()
+            query = 'SELECT id, ' + ', '.join(EVENT_FIELDS) + ' FROM events'
+            args = ()
+            if task_key:
+                query += ' WHERE task_key = ?'
+                args = (task_key,)
+            rows = self._conn.execute(query + ' ORDER BY id DESC LIMIT ?', args + (limit,)).fetchall()
+        return [dict(row) for row in rows]
@@ -195,7 +195,7 @@ document.addEventListener('DOMContentLoaded', function() {
 });
 
 // Update a single card's status without page reload
-function updateCardStatus(cardElement, taskKey, newStatus) {
+function updateCardStatus(cardElement, taskKey, newStatus, lastUpdated) {
     // Update status badge
     const statusBadge = cardElement.querySelector('.status-badge');
     statusBadge.style.backgroundColor = getStatusColor(newStatus);
@@ -241,7 +241,7 @@ function updateCardStatus(cardElement, taskKey, newStatus) {
     }
     
     // Update the last updated time
-    const timestamp = new Date().toLocaleString();
+    const timestamp = lastUpdated || new Date().toLocaleString();
     const timeElement = cardElement.querySelector('.text-muted');
     if (timeElement) {
         timeElement.innerHTML = `<i class="fas fa-history"></i> Updated: ${timestamp}`;
@@ -310,10 +310,75 @@ function showToast(title, message) {
     }, 3000);
 }
 
-// Auto refresh every 30 seconds
-setInterval(() => {
+// Other agents' changes are pushed by the server (/tasks/stream) as they happen;
+// each event carries only the tasks changed since the revision the page has.
+// EventSource reconnects by itself and resumes from the last revision it saw.
+// When the server has no stream slot left (503) the page polls /tasks/state instead.
+const TASK_POLL_MS = 15000;
+let taskRevision = document.body.dataset.revision;
+let taskEpoch = document.body.dataset.epoch;
+
+function applyTaskChanges(tasks) {
+    Object.entries(tasks).forEach(([taskKey, task]) => {
+        const button = document.querySelector(`.update-btn[data-task="${taskKey}"]`);
+        if (!button) {
+            return;
+        }
+        updateCardStatus(button.closest('.glass-card'), taskKey, task.status, task.last_updated);
+        
+        // Don't overwrite what someone is typing
+        const assignedInput = document.querySelector(`input[data-task="${taskKey}"]`);
+        const notesInput = document.querySelector(`textarea[data-task="${taskKey}"]`);
+        if (assignedInput && assignedInput !== document.activeElement) {
+            assignedInput.value = task.assigned_to;
+        }
+        if (notesInput && notesInput !== document.activeElement) {
+            notesInput.value = task.notes;
+        }
+    });
     updateFilteredSummary();
-}, 30000);
+}
+
+function taskParams() {
+    const params = new URLSearchParams();
+    if (taskRevision !== undefined && taskEpoch) {
+        params.set('since', taskRevision);
+        params.set('epoch', taskEpoch);
+    }
+    return params;
+}
+
+function applyTaskState(state) {
+    taskRevision = state.revision;
+    taskEpoch = state.epoch;
+    applyTaskChanges(state.tasks);
+}
+
+function followTasks() {
+    const source = new EventSource(`/tasks/stream?${taskParams()}`);
+    source.addEventListener('tasks', event => {
+        applyTaskState(JSON.parse(event.data));
+    });
+    source.addEventListener('error', () => {
+        // CLOSED means the server refused the stream; otherwise EventSource is reconnecting
+        if (source.readyState === EventSource.CLOSED) {
+            setTimeout(pollTasks, TASK_POLL_MS);
+        }
+    });
+}
+
+function pollTasks() {
+    fetch(`/tasks/state?${taskParams()}`, { cache: 'no-store' })
+        .then(response => response.ok ? response.json() : null)
+        .then(state => {
+            if (state) {
+                applyTaskState(state);
+            }
+        })
+        .catch(() => {})
+        .finally(() => setTimeout(pollTasks, TASK_POLL_MS));
+}
+followTasks();
 
 // Show current time in title
 setInterval(() => {
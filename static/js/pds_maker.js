@@ -6,7 +6,7 @@ function updateTime() {
 setInterval(updateTime, 1000);
 updateTime();
 
-// Run PDS script
+// Run PDS script as a background job and stream its output live
 function runScript(campaignName) {
     const btn = document.getElementById(`btn-${campaignName}`);
     const status = document.getElementById(`status-${campaignName}`);
@@ -16,79 +16,142 @@ function runScript(campaignName) {
     status.style.backgroundColor = '#17a2b8';
     status.innerHTML = '<i class="fas fa-cog fa-spin"></i> PROCESSING';
     
-    fetch(`/run/${campaignName}`)
+    fetch(`/jobs/submit/${campaignName}`, {method: 'POST'})
     .then(response => response.json())
-    .then(data => {
-        if (data.status === 'success') {
-            btn.innerHTML = '<i class="fas fa-check"></i> Completed';
-            btn.className = 'btn btn-success';
-            status.style.backgroundColor = '#28a745';
-            status.innerHTML = '<i class="fas fa-check-circle"></i> SUCCESS';
-            
-            // Show script output in a detailed toast/modal
-            showScriptOutput(campaignName, data.output || data.message, 'success');
-        } else {
-            btn.innerHTML = '<i class="fas fa-exclamation-triangle"></i> Failed';
-            btn.className = 'btn btn-danger';
-            status.style.backgroundColor = '#dc3545';
-            status.innerHTML = '<i class="fas fa-times-circle"></i> FAILED';
-            
-            // Show error output
-            const errorMessage = data.error || data.message || 'Script execution failed';
-            showScriptOutput(campaignName, errorMessage, 'error');
+    .then(job => {
+        if (job.status !== 'success') {
+            finishRun(campaignName, {status: 'error', message: job.message});
+            return;
         }
         
-        // Reset button after 3 seconds
-        setTimeout(() => {
-            btn.innerHTML = '<i class="fas fa-play"></i> Run Script';
-            btn.className = 'btn btn-primary';
-            btn.disabled = false;
-            status.style.backgroundColor = '#6c757d';
-            status.innerHTML = '<i class="fas fa-hourglass-start"></i> READY';
-        }, 3000);
+        const liveOutput = showLiveOutput(campaignName);
+        const source = new EventSource(job.stream_url);
+        
+        source.addEventListener('output', event => {
+            liveOutput.textContent += event.data + '\n';
+            liveOutput.scrollTop = liveOutput.scrollHeight;
+        });
+        
+        source.addEventListener('done', event => {
+            source.close();
+            finishRun(campaignName, JSON.parse(event.data));
+        });
+        // On network errors EventSource reconnects by itself and resumes from the last line
     })
     .catch(error => {
         console.error('Error:', error);
-        btn.innerHTML = '<i class="fas fa-exclamation-triangle"></i> Error';
+        finishRun(campaignName, {status: 'error', message: 'Network error occurred'});
+    });
+}
+
+// Update the campaign card and output modal once a run has finished
+function finishRun(campaignName, data) {
+    const btn = document.getElementById(`btn-${campaignName}`);
+    const status = document.getElementById(`status-${campaignName}`);
+    
+    if (data.status === 'success') {
+        btn.innerHTML = '<i class="fas fa-check"></i> Completed';
+        btn.className = 'btn btn-success';
+        status.style.backgroundColor = '#28a745';
+        status.innerHTML = '<i class="fas fa-check-circle"></i> SUCCESS';
+        
+        // Show script output in a detailed toast/modal
+        showScriptOutput(campaignName, data.output || data.message, 'success');
+    } else {
+        btn.innerHTML = '<i class="fas fa-exclamation-triangle"></i> Failed';
         btn.className = 'btn btn-danger';
         status.style.backgroundColor = '#dc3545';
-        status.innerHTML = '<i class="fas fa-times-circle"></i> ERROR';
+        status.innerHTML = '<i class="fas fa-times-circle"></i> FAILED';
         
-        showScriptOutput(campaignName, 'Network error occurred', 'error');
-        
-        // Reset button after 3 seconds
-        setTimeout(() => {
-            btn.innerHTML = '<i class="fas fa-play"></i> Run Script';
-            btn.className = 'btn btn-primary';
-            btn.disabled = false;
-            status.style.backgroundColor = '#6c757d';
-            status.innerHTML = '<i class="fas fa-hourglass-start"></i> READY';
-        }, 3000);
+        // Show error output
+        const errorMessage = data.error || data.message || 'Script execution failed';
+        showScriptOutput(campaignName, errorMessage, 'error');
+    }
+    
+    // Reset button after 3 seconds
+    setTimeout(() => {
+        btn.innerHTML = '<i class="fas fa-play"></i> Run Script';
+        btn.className = 'btn btn-primary';
+        btn.disabled = false;
+        status.style.backgroundColor = '#6c757d';
+        status.innerHTML = '<i class="fas fa-hourglass-start"></i> READY';
+    }, 3000);
+}
+
+// Run all campaigns in parallel on the server
+function runAllScripts() {
+    const runAllBtn = document.getElementById('btn-run-all');
+    const campaignNames = Array.from(document.querySelectorAll('[id^="status-"]'))
+        .map(el => el.id.replace('status-', ''));
+
+    runAllBtn.innerHTML = '<i class="fas fa-spinner fa-spin"></i> Running all...';
+    runAllBtn.disabled = true;
+    campaignNames.forEach(name => {
+        const btn = document.getElementById(`btn-${name}`);
+        const status = document.getElementById(`status-${name}`);
+        btn.disabled = true;
+        status.style.backgroundColor = '#17a2b8';
+        status.innerHTML = '<i class="fas fa-cog fa-spin"></i> PROCESSING';
+    });
+
+    fetch('/run_all', {
+        method: 'POST',
+        headers: {'Content-Type': 'application/json'},
+        body: JSON.stringify({campaigns: campaignNames})
+    })
+    .then(response => response.json())
+    .then(data => {
+        const lines = [`${data.message} in ${data.duration}s using ${data.workers} worker(s)`, ''];
+        (data.results || []).forEach(result => {
+            const status = document.getElementById(`status-${result.campaign}`);
+            if (result.status === 'success') {
+                status.style.backgroundColor = '#28a745';
+                status.innerHTML = '<i class="fas fa-check-circle"></i> SUCCESS';
+            } else {
+                status.style.backgroundColor = '#dc3545';
+                status.innerHTML = '<i class="fas fa-times-circle"></i> FAILED';
+            }
+            lines.push(`${result.status === 'success' ? '✅' : '❌'} ${result.campaign} (${result.duration}s) → ${result.log_file}`);
+        });
+        showScriptOutput('ALL CAMPAIGNS', lines.join('\n'), data.status === 'success' ? 'success' : 'error');
+    })
+    .catch(error => {
+        console.error('Error:', error);
+        showScriptOutput('ALL CAMPAIGNS', 'Network error occurred', 'error');
+    })
+    .finally(() => {
+        runAllBtn.innerHTML = '<i class="fas fa-forward"></i> Run All Campaigns';
+        runAllBtn.disabled = false;
+        campaignNames.forEach(name => {
+            document.getElementById(`btn-${name}`).disabled = false;
+        });
     });
 }
 
 // New function to show script output in a modal
+// type is 'success', 'error' or 'running' (live output still streaming)
 function showScriptOutput(campaignName, output, type) {
-    // Create modal HTML
-    const modalHtml = `
-        <div class="modal fade" id="scriptOutputModal" tabindex="-1">
-            <div class="modal-dialog modal-lg">
-                <div class="modal-content">
-                    <div class="modal-header ${type === 'success' ? 'bg-success' : 'bg-danger'} text-white">
+    const headerClass = {success: 'bg-success', error: 'bg-danger', running: 'bg-info'}[type];
+    const headerIcon = {success: 'fa-check-circle', error: 'fa-exclamation-triangle', running: 'fa-cog fa-spin'}[type];
+    const alertHtml = {
+        success: '<div class="alert alert-success"><strong>✅ Success:</strong> Script execution completed</div>',
+        error: '<div class="alert alert-danger"><strong>❌ Error:</strong> Script execution failed</div>',
+        running: '<div class="alert alert-info"><strong>⏳ Running:</strong> Script output is streaming live</div>'
+    }[type];
+    
+    const contentHtml = `
+                    <div class="modal-header ${headerClass} text-white">
                         <h5 class="modal-title">
-                            <i class="fas ${type === 'success' ? 'fa-check-circle' : 'fa-exclamation-triangle'}"></i>
+                            <i class="fas ${headerIcon}"></i>
                             ${campaignName} Script Output
                         </h5>
                         <button type="button" class="btn-close btn-close-white" data-bs-dismiss="modal"></button>
                     </div>
                     <div class="modal-body">
-                        <div class="alert ${type === 'success' ? 'alert-success' : 'alert-danger'}">
-                            <strong>${type === 'success' ? '✅ Success' : '❌ Error'}:</strong>
-                            Script execution ${type === 'success' ? 'completed' : 'failed'}
-                        </div>
+                        ${alertHtml}
                         <div class="script-output">
                             <h6>Script Output:</h6>
-                            <pre class="bg-dark text-light p-3 rounded" style="white-space: pre-wrap; font-family: 'Courier New', monospace; font-size: 0.9em;">${output}</pre>
+                            <pre class="bg-dark text-light p-3 rounded" style="white-space: pre-wrap; font-family: 'Courier New', monospace; font-size: 0.9em; max-height: 60vh; overflow-y: auto;">${output}</pre>
                         </div>
                         ${type === 'success' ? `
                         <div class="mt-3">
@@ -101,17 +164,29 @@ function showScriptOutput(campaignName, output, type) {
                     <div class="modal-footer">
                         <button type="button" class="btn btn-secondary" data-bs-dismiss="modal">Close</button>
                     </div>
-                </div>
-            </div>
-        </div>
     `;
     
-    // Remove existing modal if any
+    // A live run finishing updates the modal that is already open
     const existingModal = document.getElementById('scriptOutputModal');
+    if (existingModal && existingModal.classList.contains('show')) {
+        existingModal.querySelector('.modal-content').innerHTML = contentHtml;
+        return;
+    }
+    
+    // Remove existing modal if any
     if (existingModal) {
         existingModal.remove();
     }
     
+    // Create modal HTML
+    const modalHtml = `
+        <div class="modal fade" id="scriptOutputModal" tabindex="-1">
+            <div class="modal-dialog modal-lg">
+                <div class="modal-content">${contentHtml}</div>
+            </div>
+        </div>
+    `;
+    
     // Add modal to document
     document.body.insertAdjacentHTML('beforeend', modalHtml);
     
@@ -125,6 +200,12 @@ function showScriptOutput(campaignName, output, type) {
     });
 }
 
+// Open the output modal in "running" mode and return the <pre> that receives live lines
+function showLiveOutput(campaignName) {
+    showScriptOutput(campaignName, '', 'running');
+    return document.querySelector('#scriptOutputModal pre');
+}
+
 // Navbar tool functions
 function openOutputFolder() {
     fetch('/open_output_folder')
@@ -162,6 +243,11 @@ function showToast(title, message) {
     setTimeout(() => toast.remove(), 3000);
 }
 
+// Files at least this big go up in resumable chunks instead of one form post
+const CHUNKED_UPLOAD_MIN_BYTES = 8 * 1024 * 1024;
+const PARALLEL_CHUNKS = 4;
+const CHUNK_RETRIES = 3;
+
 // Upload file for a specific campaign (called from onchange in template)
 function uploadFile(campaignName) {
     const fileInput = document.getElementById(`file-input-${campaignName}`);
@@ -172,17 +258,22 @@ function uploadFile(campaignName) {
         return;
     }
     
-    const formData = new FormData();
-    formData.append('file', file);
-    
     // Show loading state
     showToast('Upload Status', 'Uploading file...');
     
-    fetch(`/upload/${campaignName}`, {
-        method: 'POST',
-        body: formData
-    })
-    .then(response => response.json())
+    let upload;
+    if (file.size >= CHUNKED_UPLOAD_MIN_BYTES) {
+        upload = uploadInChunks(file);
+    } else {
+        const formData = new FormData();
+        formData.append('file', file);
+        upload = fetch(`/upload/${campaignName}`, {
+            method: 'POST',
+            body: formData
+        }).then(response => response.json());
+    }
+    
+    upload
     .then(data => {
         if (data.status === 'success') {
             showToast('Upload Success', data.message);
@@ -195,4 +286,56 @@ function uploadFile(campaignName) {
         console.error('Upload error:', error);
         showToast('Upload Error', 'Upload error occurred');
     });
-}
\ No newline at end of file
+}
+
+// Send a large file in chunks, PARALLEL_CHUNKS at a time. The server keeps the
+// chunks it already has, so selecting the same file again after a dropped
+// connection only sends the missing ones.
+async function uploadInChunks(file) {
+    const start = await fetch('/upload_chunks', {
+        method: 'POST',
+        headers: {'Content-Type': 'application/json'},
+        body: JSON.stringify({filename: file.name, size: file.size, key: `${file.name}:${file.size}:${file.lastModified}`})
+    }).then(response => response.json());
+    if (start.status !== 'success') {
+        return start;
+    }
+    
+    const pending = start.missing.slice();
+    if (pending.length < start.chunk_count) {
+        showToast('Upload Status', `Resuming upload: ${start.chunk_count - pending.length} of ${start.chunk_count} chunks already sent`);
+    }
+    
+    const sendChunk = async index => {
+        const chunk = file.slice(index * start.chunk_size, (index + 1) * start.chunk_size);
+        for (let attempt = 1; ; attempt++) {
+            try {
+                const response = await fetch(`/upload_chunks/${start.upload_id}/${index}`, {
+                    method: 'PUT',
+                    headers: {'Content-Type': 'application/octet-stream'},
+                    body: chunk
+                });
+                if (response.ok) {
+                    return;
+                }
+                if (attempt >= CHUNK_RETRIES) {
+                    throw new Error((await response.json()).message);
+                }
+            } catch (error) {
+                if (attempt >= CHUNK_RETRIES) {
+                    throw error;
+                }
+            }
+            await new Promise(resolve => setTimeout(resolve, 1000 * attempt));
+        }
+    };
+    const worker = async () => {
+        while (pending.length) {
+            await sendChunk(pending.shift());
+        }
+    };
+    await Promise.all(Array.from({length: Math.min(PARALLEL_CHUNKS, pending.length)}, worker));
+    
+    return fetch(`/upload_chunks/${start.upload_id}/complete`, {method: 'POST'})
+        .then(response => response.json());
+}